@@ -0,0 +1,123 @@
+"""
+Benchmark: cascade dispatch order on replayed traffic
+
+Replays every message of benchmarks/corpus.py (with its dialogue history,
+where it has one) through the engine's cascade and:
+- profiles each stage on its own: how often its pre-filter lets a message
+  through, how often it answers, and its mean cost per message
+- derives the measured order (Cascade.measured_order) from that profile
+- times dispatch in priority order, in the measured order, and in
+  priority order with every pre-filter (stage and pattern tier) switched
+  off, interleaving the passes so machine drift affects all three alike
+
+All orders must give the same answer for every message; a difference
+fails the run (exit status 1).
+
+Usage: python -m benchmarks.bench_cascade [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from app import chatbot
+from benchmarks.corpus import MISSPELLINGS, PARAPHRASES, TIER_CORPUS, UTTERANCES
+from cascade import Cascade, Context
+from utterance import Utterance, normalize_message
+
+
+def replayed_traffic():
+    """(Utterance, dialogue state) for every corpus message, spelling already corrected"""
+    messages = [(message, []) for message in UTTERANCES]
+    messages += [(message, []) for message, _ in PARAPHRASES]
+    messages += [(message, []) for message, _ in MISSPELLINGS]
+    messages += [(message, history) for _, message, history in TIER_CORPUS]
+    spelling = chatbot.snapshot.spelling
+    return [(Utterance.build(spelling.correct(normalize_message(message))), chatbot.tracker.from_history(history))
+            for message, history in messages]
+
+
+def contexts(traffic):
+    return [Context(utterance, state, chatbot.snapshot) for utterance, state in traffic]
+
+
+@contextmanager
+def without_prefilters(cascade):
+    """The cascade with no stage pre-filters and no pattern tier pre-filters"""
+    saved = {tier: tier._prefilter for tier in chatbot.patterns}
+    for tier in saved:
+        tier._prefilter = None
+    try:
+        yield Cascade([stage._replace(prefilter=None) for stage in cascade.stages])
+    finally:
+        for tier, prefilter in saved.items():
+            tier._prefilter = prefilter
+
+
+def time_dispatch(cascade, traffic):
+    """Mean microseconds per message over one pass of the traffic"""
+    batch = contexts(traffic)
+    start = time.perf_counter_ns()
+    for context in batch:
+        cascade.dispatch(context)
+    return (time.perf_counter_ns() - start) / len(batch) / 1e3
+
+
+def compare(cascades, traffic, repeat):
+    """(median, best) microseconds per message for each cascade, passes interleaved against drift"""
+    samples = {name: [] for name in cascades}
+    for _ in range(repeat):
+        for name, cascade in cascades.items():
+            if callable(cascade):
+                with cascade() as unfiltered:
+                    samples[name].append(time_dispatch(unfiltered, traffic))
+            else:
+                samples[name].append(time_dispatch(cascade, traffic))
+    return {name: (statistics.median(values), min(values)) for name, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    traffic = replayed_traffic()
+    priority = chatbot.cascade
+    stats = priority.profile(contexts(traffic) * 20)
+
+    print(f"{len(traffic)} messages; per-stage profile (each stage run on every message):\n")
+    print(f"{'stage':<16}{'group':<10}{'passed':>8}{'answers':>9}{'cost us':>9}")
+    for stage in priority.stages:
+        measured = stats[stage.name]
+        print(f"{stage.name:<16}{stage.group or '':<10}{measured.passed / measured.messages:>8.0%}"
+              f"{measured.hit_rate:>9.0%}{measured.cost * 1e6:>9.2f}")
+
+    measured = priority.reordered(stats)
+    print(f"\nmeasured order: {', '.join(stage.name for stage in measured.order)}\n")
+
+    expected = [priority.dispatch(context) for context in contexts(traffic)]
+    answers = {"measured order": [measured.dispatch(context) for context in contexts(traffic)]}
+    with without_prefilters(priority) as unfiltered:
+        answers["no pre-filters"] = [unfiltered.dispatch(context) for context in contexts(traffic)]
+    failed = False
+    for name, results in answers.items():
+        for (utterance, _), result, reference in zip(traffic, results, expected):
+            if result != reference:
+                print(f"MISMATCH: {utterance.text!r} is answered differently with {name}")
+                failed = True
+
+    timings = compare({
+        "priority order": priority,
+        "measured order": measured,
+        "priority order, no pre-filters": lambda: without_prefilters(priority),
+    }, traffic, args.repeat)
+    print(f"{'dispatch':<34}{'median us':>10}{'best us':>9}")
+    for name, (median, best) in timings.items():
+        print(f"{name:<34}{median:>10.2f}{best:>9.2f}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
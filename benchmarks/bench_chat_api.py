@@ -0,0 +1,50 @@
+"""
+Benchmark for /api/chat: per-request engine construction vs the shared engine
+
+"before" rebuilds a ChatbotEngine for every message, as the old route
+did; "after" is the route as served, backed by the module-level engine.
+
+Usage: python -m benchmarks.bench_chat_api [--requests N]
+"""
+
+import argparse
+import statistics
+import time
+
+import app
+from benchmarks.corpus import UTTERANCES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    messages = [UTTERANCES[i % len(UTTERANCES)] for i in range(args.requests)]
+
+    setup = []
+    for message in messages:
+        start = time.perf_counter()
+        engine = app.ChatbotEngine()
+        setup.append(time.perf_counter() - start)
+        engine.find_best_response(message)
+
+    client = app.app.test_client()
+    before, after = [], []
+    for message in messages:
+        start = time.perf_counter()
+        app.ChatbotEngine().find_best_response(message)
+        before.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post('/api/chat', json={'message': message})
+        after.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+
+    print(f"engine construction per request: {statistics.median(setup) * 1e3:7.3f} ms (median)")
+    print(f"before, engine per request:      {statistics.median(before) * 1e3:7.3f} ms (median, engine only)")
+    print(f"after, /api/chat end to end:     {statistics.median(after) * 1e3:7.3f} ms (median, incl. Flask)")
+
+
+if __name__ == '__main__':
+    main()
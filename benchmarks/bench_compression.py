@@ -0,0 +1,73 @@
+"""
+Benchmark: gzip /api/chatbot/message bodies, spliced vs. compressed per request
+
+For the long static answers (reports, complete process, next steps, the
+help text), builds the usual message envelope and times, per response:
+- on the fly: json.dumps of the envelope, then gzip.compress (level 6)
+- spliced: only the envelope around the answer is deflated; the answer
+  comes from its precompressed AnswerFragment (http_cache.gzip_splice)
+- brotli on the fly (quality 5), when the brotli package is installed
+Every spliced body is checked to decompress to the same JSON.
+
+Usage: python -m benchmarks.bench_compression [--repeat N]
+"""
+
+import argparse
+import gzip
+import json
+import time
+
+from app import chatbot, message_payload
+from http_cache import brotli, envelope_parts, gzip_splice
+
+ANSWERS = [
+    ("reportsModule", lambda kb: kb["reportsModule"]["responses"][0]),
+    ("studentCountReport", lambda kb: kb["studentCountReport"]["responses"][0]),
+    ("completeProcess", lambda kb: kb["completeProcess"]["responses"][0]),
+    ("next: interview", lambda kb: chatbot.next_steps["interview_completed"]),
+    ("help", lambda kb: chatbot.fixed_answers["help"]),
+]
+
+
+def per_call_us(function, repeat):
+    function()
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter_ns() - start) / repeat / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    snapshot = chatbot.snapshot
+    print(f"{'answer':<20}{'JSON B':>8}{'gzip B':>8}{'on the fly us':>15}{'spliced B':>11}{'spliced us':>12}"
+          + (f"{'br B':>7}{'br us':>8}" if brotli else ''))
+    for name, answer_of in ANSWERS:
+        answer = answer_of(snapshot.knowledge_base)
+        result = {"response": answer, "category": name, "confidence": 1.0, "intent": "benchmark"}
+        payload = message_payload("tell me about it", result, "session-1", "user-1")
+        fragment = snapshot.answer_fragments[answer]
+
+        def on_the_fly():
+            return gzip.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'), compresslevel=6)
+
+        def spliced():
+            before, after = envelope_parts(payload, "bot_response")
+            return gzip_splice(before, fragment, after)
+
+        plain = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        assert json.loads(gzip.decompress(spliced())) == payload
+        line = (f"{name:<20}{len(plain):>8}{len(on_the_fly()):>8}{per_call_us(on_the_fly, args.repeat):>15.1f}"
+                f"{len(spliced()):>11}{per_call_us(spliced, args.repeat):>12.1f}")
+        if brotli:
+            def on_the_fly_br():
+                return brotli.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'), quality=5)
+            line += f"{len(on_the_fly_br()):>7}{per_call_us(on_the_fly_br, args.repeat):>8.1f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Cold-start benchmark: time to import app and to answer the first message
+
+Each sample runs in a fresh interpreter, the way a gunicorn worker boots.
+"imports" is the modules app.py imports (Flask, NumPy, the app's own
+modules); "app module" is the rest of `import app`, mostly building the
+engine, and is where the boot modes differ. The first message is one that
+needs tokens, so it includes the lazy NLTK corpus load. "to first
+response" is the wall time of the whole process, interpreter start-up
+included.
+
+Three engine boot modes are compared:
+- rebuild: no snapshot, every index is built from the knowledge base
+- snapshot: a current engine snapshot (see engine_snapshot.py) is loaded
+- stale: the snapshot does not match the knowledge base file, so it is
+  rejected and the engine rebuilds
+
+Usage: python -m benchmarks.bench_import [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import ast, importlib, json, sys, time
+start = time.perf_counter()
+with open('app.py') as f:
+    tree = ast.parse(f.read())
+for node in ast.walk(tree):
+    if isinstance(node, ast.Import):
+        names = [alias.name for alias in node.names]
+    elif isinstance(node, ast.ImportFrom) and not node.level:
+        names = [node.module]
+    else:
+        continue
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass  # optional dependency, as in app.py
+dependencies = time.perf_counter()
+import app
+imported = time.perf_counter()
+nltk_loaded = 'nltk' in sys.modules
+app.chatbot.find_best_response('how do I fill the application form?')
+answered = time.perf_counter()
+print(json.dumps({'imports': dependencies - start, 'app': imported - dependencies, 'first': answered - imported,
+                  'nltk_at_import': nltk_loaded}))
+"""
+
+
+def run_probe(runs, env):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True,
+                              check=True, env={**os.environ, **env})
+        sample = json.loads(proc.stdout.strip().splitlines()[-1])
+        sample['total'] = time.perf_counter() - start
+        samples.append(sample)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_import.')
+    try:
+        knowledge_base = os.path.join(workdir, 'knowledge_base.json')
+        snapshot = os.path.join(workdir, 'engine_snapshot.pickle')
+        shutil.copy(os.path.join(ROOT, 'knowledge_base.json'), knowledge_base)
+        env = {'KNOWLEDGE_BASE_PATH': knowledge_base, 'ENGINE_SNAPSHOT_PATH': snapshot}
+        subprocess.run([sys.executable, '-m', 'engine_snapshot', '--output', snapshot], cwd=ROOT,
+                       capture_output=True, check=True, env={**os.environ, **env})
+
+        modes = [('rebuild', {**env, 'ENGINE_SNAPSHOT_PATH': ''}), ('snapshot', env)]
+        results = [(mode, run_probe(args.runs, mode_env)) for mode, mode_env in modes]
+        # Same content, one more byte: the snapshot no longer matches the file
+        with open(knowledge_base, 'a') as f:
+            f.write('\n')
+        results.append(('stale', run_probe(args.runs, env)))
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"median of {args.runs} fresh interpreters, ms")
+    print(f"{'mode':<10}{'imports':>10}{'app module':>12}{'(min-max)':>15}{'first message':>15}"
+          f"{'to first response':>19}")
+    for mode, samples in results:
+        imports_ms = statistics.median(s['imports'] for s in samples) * 1e3
+        app_ms = [s['app'] * 1e3 for s in samples]
+        first_ms = statistics.median(s['first'] for s in samples) * 1e3
+        total_ms = statistics.median(s['total'] for s in samples) * 1e3
+        spread = f"{min(app_ms):.0f}-{max(app_ms):.0f}"
+        print(f"{mode:<10}{imports_ms:>10.1f}{statistics.median(app_ms):>12.1f}{spread:>15}{first_ms:>15.1f}"
+              f"{total_ms:>19.1f}")
+    print(f"nltk at import: {results[0][1][0]['nltk_at_import']}")
+
+
+if __name__ == '__main__':
+    main()
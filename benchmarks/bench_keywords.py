@@ -0,0 +1,81 @@
+"""
+Benchmark for the keyword fallback of find_best_response
+
+Compares the old per-category, per-keyword substring loop against the
+Aho-Corasick automaton, on the real knowledge base and on synthetic
+knowledge bases grown to a few hundred topics.
+
+Usage: python -m benchmarks.bench_keywords [--repeat N]
+"""
+
+import argparse
+import time
+
+from knowledge_base import load_knowledge_base
+from benchmarks.corpus import UTTERANCES
+from keyword_matcher import KeywordAutomaton
+
+
+def legacy_best_match(knowledge_base, input_lower):
+    best_match = None
+    max_score = 0
+    for category, data in knowledge_base.items():
+        score = 0
+        for keyword in data["keywords"]:
+            if keyword.lower() in input_lower:
+                score += len(keyword.split()) * 2
+        if score > max_score:
+            max_score = score
+            best_match = category
+    return best_match, max_score
+
+
+def grow(knowledge_base, topics):
+    """Pad the knowledge base with synthetic topics until it has `topics` entries"""
+    grown = dict(knowledge_base)
+    base = list(knowledge_base.items())
+    i = 0
+    while len(grown) < topics:
+        category, data = base[i % len(base)]
+        grown[f"{category}{i}"] = {
+            "keywords": [f"{keyword} v{i}" for keyword in data["keywords"]],
+            "responses": data["responses"],
+        }
+        i += 1
+    return grown
+
+
+def time_per_call(func, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = [u.lower().strip() for u in UTTERANCES]
+
+    print(f"{'topics':>8}{'keywords':>10}{'build (ms)':>12}{'before (us)':>14}{'after (us)':>13}{'speedup':>10}")
+    real = load_knowledge_base()
+    for topics in (len(real), 100, 300, 1000):
+        knowledge_base = grow(real, topics)
+        start = time.perf_counter()
+        automaton = KeywordAutomaton.from_knowledge_base(knowledge_base)
+        build = (time.perf_counter() - start) * 1e3
+
+        for text in corpus:
+            assert legacy_best_match(knowledge_base, text) == automaton.best_match(text), text
+
+        keywords = sum(len(data["keywords"]) for data in knowledge_base.values())
+        before = time_per_call(lambda text: legacy_best_match(knowledge_base, text), corpus, args.repeat)
+        after = time_per_call(automaton.best_match, corpus, args.repeat)
+        print(f"{len(knowledge_base):>8}{keywords:>10}{build:>12.1f}{before:>14.1f}{after:>13.1f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Load test: gunicorn worker classes and counts under a sweep of concurrency
+
+For every combination of --worker-class, --workers and --concurrency,
+starts `gunicorn app:app` on a local port, and runs a closed-loop load
+(each client sends its next request when the previous one is answered)
+for --duration seconds. The request mix is replayed from
+benchmarks/corpus.py:
+- 70% POST /api/chatbot/message, with the turn's conversationHistory
+  (no sessionId: the in-memory session store is per worker)
+- 15% GET /api/chatbot/topics
+- 15% GET /api/chatbot/greeting
+
+Reported per run: throughput, p50/p95/p99 latency, errors, and per
+worker the mean RSS and USS (unique set size: the pages no other process
+shares, from /proc/<pid>/smaps_rollup; Linux only).
+
+The load generator runs in this process. On a machine with few cores it
+competes with the workers for CPU, so compare runs with each other, not
+with production numbers. Worker classes whose module is missing (gevent
+is not in requirements.txt) are skipped.
+
+Usage: python -m benchmarks.bench_load [--worker-class sync gthread gevent]
+                                       [--workers 1 2 4] [--concurrency 1 8 32]
+                                       [--threads 4] [--duration 5] [--port PORT]
+                                       [--output FILE]
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.corpus import TIER_CORPUS, UTTERANCES
+from metrics import stage_of
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKER_MODULES = {"gevent": "gevent", "eventlet": "eventlet"}
+
+
+def request_mix(seed=0, size=1000):
+    """(method, path, body) requests in the load test's proportions"""
+    turns = [(message, list(history)) for _, message, history in TIER_CORPUS]
+    turns += [(message, []) for message in UTTERANCES]
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.70:
+            message, history = rng.choice(turns)
+            body = json.dumps({"message": message, "conversationHistory": history})
+            requests.append(("POST", "/api/chatbot/message", body))
+        elif roll < 0.85:
+            requests.append(("GET", "/api/chatbot/topics", None))
+        else:
+            requests.append(("GET", "/api/chatbot/greeting", None))
+    return requests
+
+
+def children(pid):
+    """Direct child processes of pid (the gunicorn workers of a master)"""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            pids.append(int(entry))
+    return pids
+
+
+def memory_kib(pid):
+    """(RSS, USS) of a process in KiB"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields.get('Rss', 0), fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+
+
+def start_gunicorn(worker_class, workers, threads, port, extra_args=()):
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app:app',
+        '--bind', f'127.0.0.1:{port}',
+        '--worker-class', worker_class,
+        '--workers', str(workers),
+        '--threads', str(threads),
+        '--log-level', 'warning',
+        *extra_args,
+    ]
+    env = dict(os.environ, METRICS_ENABLED='0', KNOWLEDGE_BASE_POLL='0')
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}: {' '.join(command)}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            connection.getresponse().read()
+            connection.close()
+            if len(children(server.pid)) >= workers:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    stop(server)
+    raise RuntimeError(f"gunicorn did not start on port {port}")
+
+
+def check_history_turns(port):
+    """Fail unless every TIER_CORPUS turn with history is answered by its labelled stage"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        for tier, message, history in TIER_CORPUS:
+            if not history:
+                continue
+            connection.request('POST', '/api/chatbot/message', headers={'Content-Type': 'application/json'},
+                                body=json.dumps({"message": message, "conversationHistory": history}))
+            answer = json.loads(connection.getresponse().read())
+            if stage_of(answer) != tier:
+                raise RuntimeError(f"{message!r} with its history was answered by {stage_of(answer)}, not {tier}")
+    finally:
+        connection.close()
+
+
+def stop(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def client(port, requests, offset, deadline, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    index = offset
+    while time.perf_counter() < deadline:
+        method, path, body = requests[index % len(requests)]
+        index += 1
+        headers = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'} if body else {
+            'Accept-Encoding': 'gzip'}
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            connection.close()
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run_load(port, requests, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client, args=(port, requests, i * len(requests) // concurrency,
+                                              deadline, latencies, errors))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    result = {"requests": len(latencies), "errors": len(errors), "throughput_per_s": len(latencies) / elapsed}
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        result.update(p50_ms=quantiles[49] * 1e3, p95_ms=quantiles[94] * 1e3, p99_ms=quantiles[98] * 1e3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--worker-class', nargs='+', default=['sync', 'gthread', 'gevent'])
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--threads', type=int, default=4, help="threads per gthread worker")
+    parser.add_argument('--duration', type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--gunicorn-arg', action='append', default=[],
+                        help="extra gunicorn argument (repeatable), e.g. --gunicorn-arg=--preload")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    requests = request_mix()
+    results = []
+    print(f"{'class':<9}{'workers':>8}{'threads':>8}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'errors':>7}{'RSS MiB':>9}{'USS MiB':>9}")
+    for worker_class in args.worker_class:
+        module = WORKER_MODULES.get(worker_class)
+        if module and importlib.util.find_spec(module) is None:
+            print(f"{worker_class:<9} skipped ({module} is not installed)")
+            continue
+        threads = args.threads if worker_class == 'gthread' else 1
+        for workers in args.workers:
+            server = start_gunicorn(worker_class, workers, threads, args.port, args.gunicorn_arg)
+            try:
+                check_history_turns(args.port)
+                run_load(args.port, requests, max(args.concurrency), args.warmup)
+                for concurrency in args.concurrency:
+                    result = run_load(args.port, requests, concurrency, args.duration)
+                    memory = [memory_kib(pid) for pid in children(server.pid)]
+                    result.update(
+                        worker_class=worker_class, workers=workers, threads=threads, concurrency=concurrency,
+                        rss_mib=statistics.mean(rss for rss, _ in memory) / 1024 if memory else 0.0,
+                        uss_mib=statistics.mean(uss for _, uss in memory) / 1024 if memory else 0.0,
+                    )
+                    results.append(result)
+                    print(f"{worker_class:<9}{workers:>8}{threads:>8}{concurrency:>8}"
+                          f"{result['throughput_per_s']:>9.0f}{result.get('p50_ms', 0):>9.2f}"
+                          f"{result.get('p95_ms', 0):>9.2f}{result.get('p99_ms', 0):>9.2f}"
+                          f"{result['errors']:>7}{result['rss_mib']:>9.1f}{result['uss_mib']:>9.1f}")
+            finally:
+                stop(server)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"gunicorn_args": args.gunicorn_arg, "duration": args.duration, "runs": results},
+                      f, indent=2)
+        print(f"\nresults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
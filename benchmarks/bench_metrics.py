@@ -0,0 +1,76 @@
+"""
+Overhead of the per-stage metrics in find_best_response
+
+Times find_best_response over the labelled tier corpus with metrics off
+and on, both on a warm response cache (where the fixed cost of recording
+weighs most) and with the cache bypassed, then a whole POST
+/api/chatbot/message for scale, and one /api/metrics render.
+
+Usage: python -m benchmarks.bench_metrics [--repeat N]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from app import app, chatbot
+from benchmarks.corpus import TIER_CORPUS
+from metrics import Metrics
+from response_cache import ResponseCache
+from utterance import normalize_message
+
+
+def median_us(cases, repeat):
+    samples = []
+    for _ in range(repeat):
+        for text, state in cases:
+            start = time.perf_counter_ns()
+            chatbot.find_best_response(text, dialogue_state=state)
+            samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1e3
+
+
+def request_us(client, cases, repeat):
+    samples = []
+    for _ in range(repeat):
+        for text, _ in cases:
+            start = time.perf_counter_ns()
+            client.post('/api/chatbot/message', json={'message': text})
+            samples.append(time.perf_counter_ns() - start)
+    return statistics.median(samples) / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+
+    cases = [(normalize_message(message), chatbot.tracker.from_history(history))
+             for _, message, history in TIER_CORPUS]
+    cache = chatbot.response_cache
+    uncached = ResponseCache(maxsize=0)
+    uncached.invalidate(cache.version)
+
+    with tempfile.TemporaryDirectory() as directory:
+        configs = [('off', None), ('on', Metrics()), ('on, METRICS_DIR', Metrics(directory))]
+        client = app.test_client()
+        print(f"{'metrics':<18}{'cached (us)':>13}{'uncached (us)':>15}{'request (us)':>14}")
+        for name, metrics in configs:
+            chatbot.metrics = metrics
+            chatbot.response_cache = cache
+            median_us(cases, 1)
+            warm = median_us(cases, args.repeat)
+            chatbot.response_cache = uncached
+            cold = median_us(cases, max(1, args.repeat // 10))
+            chatbot.response_cache = cache
+            request = request_us(client, cases, max(1, args.repeat // 10))
+            print(f"{name:<18}{warm:>13.2f}{cold:>15.2f}{request:>14.1f}")
+
+        start = time.perf_counter()
+        text = chatbot.metrics.render()
+        print(f"\n/api/metrics render: {(time.perf_counter() - start) * 1e3:.2f} ms, {len(text)} bytes")
+
+
+if __name__ == '__main__':
+    main()
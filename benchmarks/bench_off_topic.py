@@ -0,0 +1,82 @@
+"""
+Benchmark for the off-topic gate, the first check every message passes
+
+"before" is the old substring scan: every domain_vocabulary word and every
+off-topic keyword tested with `word in text`. "after" is the token-set
+lookup against precomputed frozensets. Messages routed differently are
+listed, since substrings also matched inside longer words
+("form" in "platform", "phone" in "smartphone").
+
+Usage: python -m benchmarks.bench_off_topic [--repeat N]
+"""
+
+import argparse
+import re
+import time
+
+from app import chatbot
+from benchmarks.corpus import UTTERANCES
+from utterance import Utterance
+
+LEGACY_OFF_TOPIC_KEYWORDS = [
+    'weather', 'movie', 'film', 'song', 'recipe', 'cook',
+    'cricket', 'football', 'game', 'vacation', 'hotel',
+    'amazon', 'flipkart', 'phone', 'laptop'
+]
+
+EXTRA_UTTERANCES = [
+    "movie tickets",
+    "any information on cricket?",
+    "best platform for movie streaming",
+    "best pizza restaurant nearby",
+    "smartphone deals",
+    "various android phones",
+    "which hotel is near the school for the interview",
+    "documents for the cricket quota",
+    "weather forecast",
+    "cookies recipe",
+    "2 + 3",
+]
+
+
+def legacy_is_off_topic(engine, input_lower):
+    if re.match(r'^\d+\s*[\+\-\*\/]\s*\d+\s*$', input_lower):
+        return True
+    admission_words = sum(1 for word in engine.domain_vocabulary if word in input_lower)
+    off_topic_words = sum(1 for word in LEGACY_OFF_TOPIC_KEYWORDS if word in input_lower)
+    return off_topic_words > 0 and admission_words == 0
+
+
+def time_per_call(func, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in corpus:
+            func(item)
+    return (time.perf_counter() - start) / (repeat * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    utterances = [Utterance.build(u) for u in UTTERANCES + EXTRA_UTTERANCES]
+    texts = [u.text for u in utterances]
+
+    before = time_per_call(lambda text: legacy_is_off_topic(chatbot, text), texts, args.repeat)
+    after = time_per_call(chatbot.is_off_topic, utterances, args.repeat)
+    build = time_per_call(Utterance.build, UTTERANCES, args.repeat)
+    print(f"before (substring scan): {before:7.2f} us/message")
+    print(f"after (token set):       {after:7.2f} us/message")
+    print(f"utterance build:         {build:7.2f} us/message (shared by every stage)")
+
+    print("\nrouting differences:")
+    for utterance in utterances:
+        old = legacy_is_off_topic(chatbot, utterance.text)
+        new = chatbot.off_topic_category(utterance)
+        if old != (new is not None):
+            print(f"  {utterance.raw!r}: off-topic {old} -> {new is not None} ({new})")
+
+
+if __name__ == '__main__':
+    main()
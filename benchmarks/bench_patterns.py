@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for the precompiled pattern registry
+
+Compares, per tier, the old per-pattern checks (one re.search or substring
+test per pattern, in a Python loop) against the single merged regex the
+registry compiles at engine construction.
+
+Usage: python -m benchmarks.bench_patterns [--repeat N]
+"""
+
+import argparse
+import re
+import time
+
+from app import chatbot
+from benchmarks.corpus import UTTERANCES
+
+
+def legacy_first(tier, text):
+    """The pre-registry loop: first entry with any matching pattern"""
+    for label, patterns in tier.entries:
+        for pattern in patterns:
+            if tier.literal:
+                if pattern in text:
+                    return label
+            elif re.search(pattern, text, tier.flags):
+                return label
+    return None
+
+
+def time_per_call(func, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = [u.lower().strip() for u in UTTERANCES]
+
+    print(f"{'tier':<15}{'patterns':>10}{'before (us)':>14}{'after (us)':>13}{'speedup':>10}")
+    for tier in chatbot.patterns:
+        for text in corpus:
+            assert legacy_first(tier, text) == tier.first(text), (tier.name, text)
+
+        count = sum(len(patterns) for _, patterns in tier.entries)
+        before = time_per_call(lambda text: legacy_first(tier, text), corpus, args.repeat)
+        after = time_per_call(tier.first, corpus, args.repeat)
+        print(f"{tier.name:<15}{count:>10}{before:>14.2f}{after:>13.2f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
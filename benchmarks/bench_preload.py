@@ -0,0 +1,112 @@
+"""
+Benchmark: unique memory of workers forked from a preloaded app
+
+Imports the app in a fresh interpreter, as gunicorn --preload does in its
+master, prepares it as the gunicorn.conf.py hooks do, and forks workers
+from it. Each worker replays the
+benchmarks/bench_load.py request mix through the Flask app, then runs a
+full garbage collection (as a long-running worker eventually does), and
+reports its USS (unique set size: the pages it no longer shares with the
+master) at each step:
+- forked: right after the fork
+- traffic: after --requests requests
+- gc: after gc.collect()
+
+Variants:
+- preload: as the gunicorn.conf.py hooks do (warm-up requests, then gc.freeze)
+- no warm-up: gc.freeze only (PRELOAD_WARM_UP=0)
+- no warm-up, no freeze: the app as imported
+
+Linux only (/proc/<pid>/smaps_rollup). For a real server, compare
+python -m benchmarks.bench_load with and without --gunicorn-arg=--preload.
+
+Usage: python -m benchmarks.bench_preload [--samples N] [--requests N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.bench_load import memory_kib, request_mix
+
+STEPS = ('forked', 'traffic', 'gc')
+# name -> (warm up, freeze)
+VARIANTS = {
+    "preload": (True, True),
+    "no warm-up": (False, True),
+    "no warm-up, no freeze": (False, False),
+}
+
+
+def worker(app, requests, write_fd):
+    """Body of a forked worker: replay the requests, report USS after each step"""
+    uss = {'forked': memory_kib(os.getpid())[1]}
+    client = app.test_client()
+    for method, path, body in requests:
+        client.open(path, method=method, data=body, content_type='application/json')
+    uss['traffic'] = memory_kib(os.getpid())[1]
+    gc.collect()
+    uss['gc'] = memory_kib(os.getpid())[1]
+    with os.fdopen(write_fd, 'w') as f:
+        json.dump(uss, f)
+
+
+def fork_worker(app, requests):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            worker(app, requests, write_fd)
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        report = f.read()
+    os.waitpid(pid, 0)
+    return json.loads(report)
+
+
+def measure(samples, size, warm, freeze):
+    """USS of forked workers, per step (runs in the child interpreter)"""
+    from app import app, warm_up
+
+    if warm:
+        warm_up()
+    if freeze:
+        gc.freeze()
+    requests = request_mix(size=size)
+    reports = [fork_worker(app, requests) for _ in range(samples)]
+    print(json.dumps({step: statistics.median(report[step] for report in reports) for step in STEPS}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--samples', type=int, default=5, help="workers forked per variant")
+    parser.add_argument('--requests', type=int, default=500, help="requests replayed by each worker")
+    parser.add_argument('--measure', choices=list(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.samples, args.requests, *VARIANTS[args.measure])
+        return
+
+    print(f"USS per worker, MiB (median of {args.samples}); {args.requests} requests each\n")
+    print(f"{'master':<24}" + ''.join(f"{step:>10}" for step in STEPS))
+    for name in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_preload', '--measure', name,
+             '--samples', str(args.samples), '--requests', str(args.requests)],
+            env=dict(os.environ, METRICS_ENABLED='0', KNOWLEDGE_BASE_POLL='0'),
+            check=True, capture_output=True, text=True,
+        ).stdout
+        uss = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:<24}" + ''.join(f"{uss[step] / 1024:>10.1f}" for step in STEPS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark and accuracy check for the retrieval tiers (TF-IDF and BM25)
+
+Latency: index build and per-query search on the real knowledge base and
+on synthetic ones grown to a few thousand topics. BM25 walks only the
+posting lists of the query terms: with topics of their own vocabulary
+("distinct") its query time stays flat as the knowledge base grows; with
+copies of the real topics ("copies", every term shared) the posting lists
+themselves grow, which is the worst case. The dense TF-IDF matrix is
+only timed on copies, since distinct vocabularies would make it huge.
+Accuracy: top-1 category on the labelled paraphrase set, for the literal
+keyword fallback alone, each retrieval index alone, and the order the
+cascade uses (keyword, then TF-IDF, then BM25).
+
+Usage: python -m benchmarks.bench_retrieval [--repeat N]
+"""
+
+import argparse
+import time
+
+from app import chatbot
+from benchmarks.bench_keywords import grow
+from benchmarks.corpus import PARAPHRASES, UTTERANCES
+from retrieval import Bm25Index, TfidfIndex
+from utterance import TOKEN_RE, Utterance
+
+
+def grow_distinct(knowledge_base, topics):
+    """Pad with synthetic topics whose terms are not shared with the real ones"""
+    grown = dict(knowledge_base)
+    base = list(knowledge_base.values())
+    i = 0
+    while len(grown) < topics:
+        data = base[i % len(base)]
+        suffix = f"x{i}"
+        grown[f"synthetic{i}"] = {
+            "keywords": [TOKEN_RE.sub(lambda m: m.group() + suffix, k) for k in data["keywords"]],
+            "responses": [TOKEN_RE.sub(lambda m: m.group() + suffix, r) for r in data["responses"]],
+        }
+        i += 1
+    return grown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    queries = [Utterance.build(u).tokens for u in UTTERANCES + [p for p, _ in PARAPHRASES]]
+
+    print(f"{'growth':>9}{'index':>6}{'topics':>8}{'build (ms)':>12}{'query (us)':>12}")
+    both = (('tfidf', TfidfIndex), ('bm25', Bm25Index))
+    real = chatbot.knowledge_base
+    sizes = [('real', len(real), grow, both)]
+    sizes += [('distinct', topics, grow_distinct, both[1:]) for topics in (300, 3000)]
+    sizes += [('copies', topics, grow, both) for topics in (300, 3000)]
+    for growth, topics, func, indexes in sizes:
+        knowledge_base = func(real, topics)
+        for name, cls in indexes:
+            start = time.perf_counter()
+            index = cls.from_knowledge_base(knowledge_base)
+            build = (time.perf_counter() - start) * 1e3
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for tokens in queries:
+                    index.search(tokens, k=3)
+            query = (time.perf_counter() - start) / (args.repeat * len(queries)) * 1e6
+            print(f"{growth:>9}{name:>6}{len(knowledge_base):>8}{build:>12.1f}{query:>12.1f}")
+
+    def top(matches, threshold):
+        return matches[0][0] if matches and matches[0][1] >= threshold else None
+
+    keyword = tfidf = bm25 = combined = 0
+    for text, label in PARAPHRASES:
+        utterance = Utterance.build(text)
+        keyword_match, _ = chatbot.keyword_automaton.best_match(utterance.text)
+        tfidf_match = top(chatbot.tfidf_index.search(utterance.tokens), chatbot.retrieval_threshold)
+        bm25_match = top(chatbot.bm25_index.search(utterance.tokens), chatbot.bm25_threshold)
+        keyword += keyword_match == label
+        tfidf += tfidf_match == label
+        bm25 += bm25_match == label
+        combined += (keyword_match or tfidf_match or bm25_match) == label
+
+    total = len(PARAPHRASES)
+    print(f"\ntop-1 accuracy on {total} labelled paraphrases:")
+    print(f"  keyword fallback:          {keyword:>3}/{total}")
+    print(f"  tfidf (>= {chatbot.retrieval_threshold}):            {tfidf:>3}/{total}")
+    print(f"  bm25 (>= {chatbot.bm25_threshold}):              {bm25:>3}/{total}")
+    print(f"  keyword, tfidf, then bm25: {combined:>3}/{total}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: serializing /api/chatbot/message envelopes with long answers
+
+For the long static answers, times per response:
+- jsonify: Flask's jsonify of the envelope dict, the old code path
+- json.dumps / orjson.dumps: the whole envelope with one encoder
+- http_cache.dumps: what /api/chatbot/message now uses (orjson when
+  installed, else a reused stdlib encoder); "stdlib" forces the latter
+- spliced: the envelope encoded around the answer's pre-encoded JSON
+  fragment (http_cache.envelope_parts), with http_cache.dumps
+Every spliced body is checked to decode to the same envelope.
+
+Usage: python -m benchmarks.bench_serialization [--repeat N]
+"""
+
+import argparse
+import json
+import time
+from contextlib import contextmanager
+
+import http_cache
+from app import app, chatbot, message_payload
+from flask import jsonify
+
+ANSWERS = [
+    ("reportsModule", lambda kb: kb["reportsModule"]["responses"][0]),
+    ("studentCountReport", lambda kb: kb["studentCountReport"]["responses"][0]),
+    ("completeProcess", lambda kb: kb["completeProcess"]["responses"][0]),
+    ("next: interview", lambda kb: chatbot.next_steps["interview_completed"]),
+    ("help", lambda kb: chatbot.fixed_answers["help"]),
+]
+
+
+def per_call_us(function, repeat):
+    function()
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter_ns() - start) / repeat / 1e3
+
+
+@contextmanager
+def stdlib_encoder():
+    """http_cache with its orjson switched off"""
+    saved, http_cache.orjson = http_cache.orjson, None
+    try:
+        yield
+    finally:
+        http_cache.orjson = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+
+    orjson = http_cache.orjson
+    columns = ["jsonify", "json.dumps", "dumps stdlib", "spliced stdlib"]
+    if orjson:
+        columns += ["dumps orjson", "spliced orjson"]
+    print(f"{'answer':<20}" + ''.join(f"{column:>16}" for column in columns) + "   (us per response)")
+
+    snapshot = chatbot.snapshot
+    with app.app_context():
+        for name, answer_of in ANSWERS:
+            answer = answer_of(snapshot.knowledge_base)
+            result = {"response": answer, "category": name, "confidence": 1.0, "intent": "benchmark"}
+            payload = message_payload("tell me about it", result, "session-1", "user-1")
+            fragment = snapshot.answer_fragments[answer]
+
+            def spliced():
+                before, after = http_cache.envelope_parts(payload, "bot_response")
+                return before + fragment.json + after
+
+            def encoders(suffix):
+                assert json.loads(spliced()) == payload
+                return {
+                    "dumps " + suffix: per_call_us(lambda: http_cache.dumps(payload), args.repeat),
+                    "spliced " + suffix: per_call_us(spliced, args.repeat),
+                }
+
+            timings = {
+                "jsonify": per_call_us(lambda: jsonify(payload), args.repeat),
+                "json.dumps": per_call_us(lambda: json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                          args.repeat),
+            }
+            if orjson:
+                timings.update(encoders("orjson"))
+            with stdlib_encoder():
+                timings.update(encoders("stdlib"))
+            print(f"{name:<20}" + ''.join(f"{timings[column]:>16.2f}" for column in columns))
+
+
+if __name__ == '__main__':
+    main()
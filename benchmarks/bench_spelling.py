@@ -0,0 +1,64 @@
+"""
+Typo correction: hit rate, false corrections and latency
+
+- hit rate: misspelled messages corrected to exactly the intended text
+- false corrections: clean messages from the shared corpus that the
+  corrector changed anyway
+- answered: misspelled messages the engine answers with something other
+  than the generic help reply, without and with correction
+- latency: one uncached token lookup, and a whole message through the
+  cached corrector
+
+Usage: python -m benchmarks.bench_spelling [--repeat N]
+"""
+
+import argparse
+import time
+
+from app import chatbot
+from benchmarks.corpus import MISSPELLINGS, PARAPHRASES, UTTERANCES
+from utterance import normalize_message
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+    spelling = chatbot.spelling
+
+    fixed = sum(spelling.correct(normalize_message(typo)) == normalize_message(intended)
+                for typo, intended in MISSPELLINGS)
+    clean = [normalize_message(text) for text in UTTERANCES + [p for p, _ in PARAPHRASES]]
+    changed = [text for text in clean if spelling.correct(text) != text]
+
+    uncorrected = chatbot.snapshot._replace(spelling=type(spelling)({}))
+    without = sum(chatbot._resolve_response(typo, {}, uncorrected)["category"] != "help" for typo, _ in MISSPELLINGS)
+    answered = sum(chatbot._resolve_response(typo, {})["category"] != "help" for typo, _ in MISSPELLINGS)
+
+    total = len(MISSPELLINGS)
+    print(f"dictionary: {spelling.stats()['words']} words, {spelling.stats()['deletions']} deletion keys")
+    print(f"hit rate:          {fixed}/{total}")
+    print(f"false corrections: {len(changed)}/{len(clean)} {changed}")
+    print(f"answered (not help), without correction: {without}/{total}, with: {answered}/{total}")
+
+    tokens = [word for typo, _ in MISSPELLINGS for word in normalize_message(typo).split()]
+    start = time.perf_counter()
+    for _ in range(args.repeat // 10 or 1):
+        for token in tokens:
+            spelling._lookup(token)
+    cold = (time.perf_counter() - start) / ((args.repeat // 10 or 1) * len(tokens)) * 1e6
+
+    messages = [normalize_message(typo) for typo, _ in MISSPELLINGS] + clean
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in messages:
+            spelling.correct(text)
+    warm = (time.perf_counter() - start) / (args.repeat * len(messages)) * 1e6
+
+    print(f"uncached lookup:   {cold:.1f} us/token")
+    print(f"cached correct():  {warm:.1f} us/message")
+    print(f"cache: {spelling.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark suite: find_best_response latency and allocations per cascade tier
+
+Runs the labelled TIER_CORPUS (benchmarks/corpus.py) through the uncached
+cascade (ChatbotEngine._resolve_response) and reports, per tier:
+- p50/p95/p99 latency in microseconds
+- throughput, in messages per second
+- allocations per message: tracemalloc peak and retained bytes, measured
+  in a separate pass so tracing does not skew the timings
+A "cached" row times the public find_best_response on a warm response
+cache, for comparison.
+
+Every label is checked first: a message answered by a different tier
+than the one it is labelled with fails the run, since it would no longer
+benchmark what it claims to.
+
+Results can be saved as JSON (--output) and compared with an earlier run
+(--baseline). The run fails (exit status 1) if any tier's p50 regressed
+by more than --max-regression (a fraction, default 0.25) and by more
+than --min-delta-us (default 2), so microsecond jitter on the fastest
+tiers does not fail it.
+
+Usage: python -m benchmarks.bench_tiers [--repeat N] [--output FILE]
+                                        [--baseline FILE] [--max-regression F]
+                                        [--min-delta-us US]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from app import chatbot
+from benchmarks.corpus import TIER_CORPUS
+from metrics import stage_of
+from utterance import normalize_message
+
+
+def percentile(quantiles, p):
+    return quantiles[p - 1]
+
+
+def summarize(samples_ns):
+    quantiles = statistics.quantiles(samples_ns, n=100, method='inclusive')
+    return {
+        "samples": len(samples_ns),
+        "p50_us": round(percentile(quantiles, 50) / 1e3, 2),
+        "p95_us": round(percentile(quantiles, 95) / 1e3, 2),
+        "p99_us": round(percentile(quantiles, 99) / 1e3, 2),
+        "throughput_per_s": round(len(samples_ns) / (sum(samples_ns) / 1e9), 1),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat):
+    cases = [(tier, normalize_message(message), chatbot.tracker.from_history(history))
+             for tier, message, history in TIER_CORPUS]
+
+    mislabelled = []
+    for tier, text, state in cases:
+        actual = stage_of(chatbot._resolve_response(text, state))
+        if actual != tier:
+            mislabelled.append((text, tier, actual))
+
+    # Warm-up pass (spelling memo, lazy imports, CPU caches) before timing
+    for tier, text, state in cases:
+        chatbot._resolve_response(text, state)
+
+    timings = defaultdict(list)
+    for _ in range(repeat):
+        for tier, text, state in cases:
+            start = time.perf_counter_ns()
+            chatbot._resolve_response(text, state)
+            timings[tier].append(time.perf_counter_ns() - start)
+
+    for tier, text, state in cases:
+        chatbot.find_best_response(text, dialogue_state=state)
+    for _ in range(repeat):
+        for tier, text, state in cases:
+            start = time.perf_counter_ns()
+            chatbot.find_best_response(text, dialogue_state=state)
+            timings["cached"].append(time.perf_counter_ns() - start)
+
+    allocations = defaultdict(lambda: ([], []))
+    tracemalloc.start()
+    for tier, text, state in cases:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = chatbot._resolve_response(text, state)
+        current, peak = tracemalloc.get_traced_memory()
+        allocations[tier][0].append(peak - before)
+        allocations[tier][1].append(current - before)
+        del result
+    tracemalloc.stop()
+
+    tiers = {}
+    for tier, samples in timings.items():
+        tiers[tier] = summarize(samples)
+        if tier in allocations:
+            peaks, retained = allocations[tier]
+            tiers[tier]["alloc_peak_bytes"] = int(statistics.median(peaks))
+            tiers[tier]["alloc_retained_bytes"] = int(statistics.median(retained))
+    return tiers, mislabelled
+
+
+def regressions(tiers, baseline, max_regression, min_delta_us, metric="p50_us"):
+    """(tier, before, after) for every tier slower than baseline beyond both limits"""
+    slower = []
+    for tier, stats in tiers.items():
+        before = baseline.get("tiers", {}).get(tier, {}).get(metric)
+        if before and stats[metric] > max(before * (1 + max_regression), before + min_delta_us):
+            slower.append((tier, before, stats[metric]))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    parser.add_argument('--min-delta-us', type=float, default=2.0)
+    args = parser.parse_args()
+
+    tiers, mislabelled = run(args.repeat)
+
+    print(f"{'tier':<16}{'samples':>8}{'p50 us':>9}{'p95 us':>9}{'p99 us':>9}{'msg/s':>10}"
+          f"{'peak B':>9}{'kept B':>8}")
+    for tier, stats in tiers.items():
+        print(f"{tier:<16}{stats['samples']:>8}{stats['p50_us']:>9.1f}{stats['p95_us']:>9.1f}"
+              f"{stats['p99_us']:>9.1f}{stats['throughput_per_s']:>10.0f}"
+              f"{stats.get('alloc_peak_bytes', ''):>9}{stats.get('alloc_retained_bytes', ''):>8}")
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "revision": git_revision(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "repeat": args.repeat,
+        },
+        "tiers": tiers,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {args.output}")
+
+    failed = False
+    for text, expected, actual in mislabelled:
+        print(f"MISLABELLED: {text!r} is labelled {expected} but answered by {actual}")
+        failed = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for tier, before, after in regressions(tiers, baseline, args.max_regression, args.min_delta_us):
+            print(f"REGRESSION: {tier} p50 {before:.1f} us -> {after:.1f} us "
+                  f"(+{(after / before - 1) * 100:.0f}%, limit +{args.max_regression * 100:.0f}%)")
+            failed = True
+        if not failed:
+            print(f"no tier regressed by more than {args.max_regression * 100:.0f}% against {args.baseline}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
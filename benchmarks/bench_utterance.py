@@ -0,0 +1,50 @@
+"""
+Per-message preprocessing cost of the response cascade
+
+Runs every corpus utterance through the uncached cascade and reports the
+time and the peak memory allocated (tracemalloc) per message.
+
+Usage: python -m benchmarks.bench_utterance [--repeat N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from app import chatbot
+from benchmarks.corpus import UTTERANCES
+from dialogue_state import new_dialogue_state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    state = new_dialogue_state()
+    corpus = [u.lower() for u in UTTERANCES]
+    for text in corpus:
+        chatbot._resolve_response(text, state)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in corpus:
+            chatbot._resolve_response(text, state)
+    per_message = (time.perf_counter() - start) / (args.repeat * len(corpus)) * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    for text in corpus:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        chatbot._resolve_response(text, state)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    print(f"time per message:        {per_message:8.1f} us")
+    print(f"peak alloc per message:  {sum(peaks) / len(peaks):8.0f} bytes (mean)")
+    print(f"peak alloc, worst case:  {max(peaks):8.0f} bytes")
+
+
+if __name__ == '__main__':
+    main()
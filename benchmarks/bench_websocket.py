@@ -0,0 +1,172 @@
+"""
+Load test: WebSocket channel vs. HTTP POST /api/chatbot/message
+
+Starts the app on a local port (Flask's threaded server, in a subprocess)
+and sends the same messages with --clients concurrent clients, each with
+its own session, over:
+- http+preflight: a new connection per message, with the CORS preflight
+  (OPTIONS) a browser sends before a cross-origin JSON POST
+- http keep-alive: one persistent connection per client, POST only
+- websocket: one /api/chatbot/ws connection per client
+
+and reports round-trip latency, throughput and the server process's CPU
+time per message (from /proc, so Linux only).
+
+The WebSocket rows need flask-sock (and its simple-websocket client),
+from requirements.txt; without them they are skipped.
+
+Usage: python -m benchmarks.bench_websocket [--clients N] [--messages N] [--port PORT]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.corpus import UTTERANCES
+
+try:
+    import simple_websocket
+except ImportError:
+    simple_websocket = None
+
+ORIGIN = 'https://app.example.com'
+
+
+def server_cpu_seconds(pid):
+    """User + system CPU time of a running process"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def start_server(port):
+    code = f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+    env = dict(os.environ, METRICS_ENABLED='0', KNOWLEDGE_BASE_POLL='0')
+    server = subprocess.Popen([sys.executable, '-c', code], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            health = json.loads(connection.getresponse().read())
+            connection.close()
+            return server, health
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def post(connection, body):
+    connection.request('POST', '/api/chatbot/message', body=body,
+                       headers={'Content-Type': 'application/json', 'Origin': ORIGIN})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"POST /api/chatbot/message: HTTP {response.status}")
+
+
+def http_preflight_client(port, session_id, messages, latencies):
+    for message in messages:
+        body = json.dumps({"message": message, "sessionId": session_id})
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        connection.request('OPTIONS', '/api/chatbot/message', headers={
+            'Origin': ORIGIN,
+            'Access-Control-Request-Method': 'POST',
+            'Access-Control-Request-Headers': 'content-type',
+        })
+        connection.getresponse().read()
+        post(connection, body)
+        connection.close()
+        latencies.append(time.perf_counter() - start)
+
+
+def http_keepalive_client(port, session_id, messages, latencies):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    for message in messages:
+        body = json.dumps({"message": message, "sessionId": session_id})
+        start = time.perf_counter()
+        post(connection, body)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def websocket_client(port, session_id, messages, latencies):
+    ws = simple_websocket.Client(f'ws://127.0.0.1:{port}/api/chatbot/ws?sessionId={session_id}')
+    try:
+        for request_id, message in enumerate(messages):
+            start = time.perf_counter()
+            ws.send(json.dumps({"message": message, "requestId": request_id}))
+            reply = json.loads(ws.receive())
+            latencies.append(time.perf_counter() - start)
+            if reply.get("request_id") != request_id:
+                raise RuntimeError(f"reply to request {reply.get('request_id')} instead of {request_id}")
+    finally:
+        ws.close()
+
+
+def run(client, port, server_pid, clients, messages):
+    latencies = []
+    threads = [
+        threading.Thread(target=client, args=(port, f'bench-{client.__name__}-{i}', messages, latencies))
+        for i in range(clients)
+    ]
+    cpu_before = server_cpu_seconds(server_pid)
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    cpu = server_cpu_seconds(server_pid) - cpu_before
+    count = len(latencies)
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        "messages": count,
+        "p50_ms": quantiles[49] * 1e3,
+        "p95_ms": quantiles[94] * 1e3,
+        "per_s": count / elapsed,
+        "cpu_ms": cpu / count * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--messages', type=int, default=200, help="messages per client")
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    messages = [UTTERANCES[i % len(UTTERANCES)] for i in range(args.messages)]
+    clients = [("http+preflight", http_preflight_client), ("http keep-alive", http_keepalive_client)]
+    server, health = start_server(args.port)
+    try:
+        if simple_websocket is None or not health.get("websocket"):
+            print("websocket: skipped (install flask-sock from requirements.txt)\n")
+        else:
+            clients.append(("websocket", websocket_client))
+
+        # Warm up the engine and the server's threads
+        run(http_keepalive_client, args.port, server.pid, args.clients, messages[:20])
+
+        print(f"{args.clients} clients x {args.messages} messages\n")
+        print(f"{'channel':<18}{'p50 ms':>8}{'p95 ms':>8}{'msg/s':>9}{'server CPU ms/msg':>19}")
+        for name, client in clients:
+            stats = run(client, args.port, server.pid, args.clients, messages)
+            print(f"{name:<18}{stats['p50_ms']:>8.2f}{stats['p95_ms']:>8.2f}{stats['per_s']:>9.0f}"
+                  f"{stats['cpu_ms']:>19.3f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Fixed utterance corpus shared by the benchmark scripts
+"""
+
+UTTERANCES = [
+    "hi",
+    "hello, I need some help",
+    "good morning",
+    "thank you so much",
+    "bye",
+    "what is the weather today",
+    "I filled the application form, what next?",
+    "I have completed the health form",
+    "registration completed, what should I do now",
+    "I attended the interview",
+    "I got my marks",
+    "what next?",
+    "how to proceed",
+    "where can I verify my details",
+    "What is the health form?",
+    "How do I fill the application form?",
+    "How to check my admission status?",
+    "Tell me about interview schedules",
+    "What is the complete admission process?",
+    "How will I know if my child is selected?",
+    "Where can I check test marks?",
+    "when is the oral test",
+    "how to upload the student photo",
+    "how much is the fee",
+    "parent details",
+    "transfer student",
+    "enquiry report",
+    "student count report",
+    "mandatory fields",
+    "tell me more about that",
+    "can I pay online",
+    "purple elephant",
+]
+
+# Paraphrased questions labelled with the KNOWLEDGE_BASE category that
+# answers them; most avoid the literal keywords on purpose
+PARAPHRASES = [
+    ("which illnesses should I declare for my son", "healthForm"),
+    ("where do I mention the clinic we prefer in emergencies", "healthForm"),
+    ("can I attach a picture of my daughter", "documentUpload"),
+    ("what image formats and sizes are accepted", "documentUpload"),
+    ("what happens in the spoken round with the panel", "oralTest"),
+    ("what do I bring for the oral round", "oralTest"),
+    ("where is the venue for the entrance examination", "writtenTest"),
+    ("which subjects are covered in the entrance paper", "writtenTest"),
+    ("where are the interview scores published", "marksEntry"),
+    ("has my seat been secured", "admissionStatus"),
+    ("is my application still being reviewed by the committee", "applicationStatus"),
+    ("how much money do I have to pay", "fees"),
+    ("can I pay online and get a receipt", "fees"),
+    ("which fields are compulsory", "mandatoryFields"),
+    ("fields marked with an asterisk", "mandatoryFields"),
+    ("what does the brochure contain", "prospectusReport"),
+    ("list of families who enquired about admission", "enquiryReport"),
+    ("class wise and gender wise numbers of applicants", "studentCountReport"),
+    ("download the list of registered children", "registrationReport"),
+    ("what kinds of reports can be generated", "reportsModule"),
+    ("walk me through the whole admission journey", "completeProcess"),
+    ("when does a student move from pre admission to admission", "transferStudent"),
+    ("where do I enter the occupation of the father", "parentDetails"),
+    ("where do I look over everything I entered before the tests", "registration"),
+    ("select year and class to display my submitted application", "documentView"),
+    ("date of birth, religion and caste fields", "applicationFormDetails"),
+    ("mother tongue and nationality", "applicationFormDetails"),
+    ("attendance and venue allocation for tests", "scheduleReport"),
+    ("oral and written test dates and times", "interviewSchedule"),
+    ("what does waiting, accepted or rejected mean", "applicationStatus"),
+]
+
+# Misspelled messages paired with the intended spelling
+MISSPELLINGS = [
+    ("aplication form", "application form"),
+    ("helth form", "health form"),
+    ("intervew", "interview"),
+    ("intervew schedule", "interview schedule"),
+    ("when is the oral tset", "when is the oral test"),
+    ("writen test date", "written test date"),
+    ("regstration", "registration"),
+    ("how do I registr", "how do I register"),
+    ("uplaod documents", "upload documents"),
+    ("documnet view", "document view"),
+    ("admision status", "admission status"),
+    ("aplication status", "application status"),
+    ("what are the fess", "what are the fees"),
+    ("payemnt of fee", "payment of fee"),
+    ("prospectus reprot", "prospectus report"),
+    ("enquirey report", "enquiry report"),
+    ("mandatroy fields", "mandatory fields"),
+    ("parnet details", "parent details"),
+    ("chronic diseese", "chronic disease"),
+    ("emergancy contact", "emergency contact"),
+    ("medcal form", "medical form"),
+    ("transfer studnet", "transfer student"),
+    ("marks entyr", "marks entry"),
+    ("interview scheduel", "interview schedule"),
+    ("I have completd the health form", "I have completed the health form"),
+    ("whats the procesure", "whats the procedure"),
+    ("venu of the test", "venue of the test"),
+    ("pre admision process", "pre admission process"),
+    ("nationalty and religon", "nationality and religion"),
+    ("scedule report", "schedule report"),
+]
+
+# Messages labelled with the find_best_response tier expected to answer
+# them, as (tier, message, conversationHistory). The tier names match
+# metrics.stage_of; benchmarks.bench_tiers checks every label on each run.
+TIER_CORPUS = [
+    ("off_topic", "2 + 2", []),
+    ("off_topic", "recommend a good movie", []),
+    ("off_topic", "best cricket match", []),
+    ("off_topic", "book a flight and a hotel", []),
+    ("courtesy", "hi", []),
+    ("courtesy", "good morning", []),
+    ("courtesy", "thank you so much", []),
+    ("courtesy", "bye", []),
+    ("completion_next", "I filled the application form, what next?", []),
+    ("completion_next", "registration completed, what should I do now", []),
+    ("completion_next", "I attended the interview, what next", []),
+    ("completion", "I have completed the health form", []),
+    ("completion", "I attended the interview", []),
+    ("completion", "I got my marks", []),
+    ("next_step", "what next?", [{"role": "user", "message": "I filled the application form"}]),
+    ("next_step", "how to proceed", [{"role": "user", "message": "I have completed the health form"}]),
+    ("next_step", "what should I do now", [{"role": "user", "message": "tell me about the interview"}]),
+    ("next_step", "what next?", []),
+    ("vague_context", "tell me more about that", [
+        {"role": "user", "message": "what is the health form"},
+        {"role": "assistant", "category": "healthForm"},
+    ]),
+    ("vague_context", "more info", [
+        {"role": "user", "message": "how much is the fee"},
+        {"role": "assistant", "category": "fees"},
+    ]),
+    ("semantic", "where can I verify my details", []),
+    ("semantic", "how to upload the student photo", []),
+    ("semantic", "when is the oral test", []),
+    ("semantic", "What is the health form?", []),
+    ("topic_regex", "transfer student", []),
+    ("topic_regex", "how much is the fee", []),
+    ("topic_regex", "emergency contact", []),
+    ("topic_regex", "track application", []),
+    ("keyword", "mandatory fields", []),
+    ("keyword", "enquiry report", []),
+    ("keyword", "student count report", []),
+    ("keyword", "can I pay online", []),
+    ("tfidf", "has my seat been secured", []),
+    ("tfidf", "what image formats and sizes are accepted", []),
+    ("tfidf", "walk me through the whole admission journey", []),
+    ("bm25", "can I convert the caste date to pdf", []),
+    ("bm25", "convert my date of birth proof to pdf", []),
+    ("fallback", "purple elephant", []),
+    ("fallback", "tell me more about that", []),
+    ("fallback", "ok", []),
+]
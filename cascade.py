@@ -0,0 +1,155 @@
+"""
+Declarative response cascade: stages, pre-filters and the dispatcher
+
+The engine answers a message with the first stage of an ordered list that
+produces an answer (off-topic, courtesy, completion, ..., BM25, help).
+Each Stage declares:
+- name: the stage name, as reported by metrics.stage_of
+- run(context): the answer, or None to pass the message on
+- prefilter(context): optional cheap check; False skips run() because the
+  stage cannot answer (e.g. no word a next-step pattern starts with)
+- group: stages sharing a group never both answer the same message
+
+The list order is the priority order, and it decides which stage answers
+when several could. The dispatcher may still evaluate the stages of a
+group in another order: at most one of them can answer, so the result is
+the same whichever runs first. profile() measures every stage's cost and
+hit rate on replayed traffic, and reordered() puts each group's likeliest
+and cheapest stages first; stages outside a group always keep their
+priority position.
+"""
+
+import time
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class Context:
+    """One message on its way through the cascade"""
+
+    __slots__ = ('utterance', 'dialogue_state', 'snapshot', 'memo')
+
+    def __init__(self, utterance, dialogue_state: Dict, snapshot):
+        self.utterance = utterance
+        self.dialogue_state = dialogue_state
+        self.snapshot = snapshot
+        # Intermediate results several stages need, computed once
+        self.memo: Dict[Any, Any] = {}
+
+    def may_match(self, tier) -> bool:
+        """tier.may_match on this message's text, evaluated once per message"""
+        key = ('may_match', tier.name)
+        result = self.memo.get(key)
+        if result is None:
+            result = self.memo[key] = tier.may_match(self.utterance.text)
+        return result
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[Context], Optional[Dict]]
+    prefilter: Optional[Callable[[Context], bool]] = None
+    group: Optional[str] = None
+
+
+class StageStats(NamedTuple):
+    """What one stage did on a replayed sample of messages"""
+    messages: int
+    passed: int       # messages its pre-filter let through
+    hits: int         # messages it produced an answer for
+    seconds: float    # total time in prefilter and run
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.messages if self.messages else 0.0
+
+    @property
+    def cost(self) -> float:
+        """Mean seconds per message"""
+        return self.seconds / self.messages if self.messages else 0.0
+
+
+class Cascade:
+    """Ordered stages; dispatch() returns the answer of the first one that has one"""
+
+    def __init__(self, stages: Sequence[Stage], order: Optional[Sequence[str]] = None):
+        self.stages = tuple(stages)
+        by_name = {stage.name: stage for stage in self.stages}
+        if len(by_name) != len(self.stages):
+            raise ValueError("Cascade stage names must be unique")
+        if order is None:
+            self.order = self.stages
+        else:
+            self.order = tuple(by_name[name] for name in order)
+            if sorted(order) != sorted(by_name) or not self._keeps_priority(self.order):
+                raise ValueError(f"Order {list(order)} changes which stage answers first")
+
+    def _keeps_priority(self, order: Sequence[Stage]) -> bool:
+        """True if only stages of the same group trade places"""
+        position = {stage.name: index for index, stage in enumerate(self.stages)}
+        for index, stage in enumerate(order):
+            for later in order[index + 1:]:
+                if position[later.name] < position[stage.name] and (
+                        stage.group is None or stage.group != later.group):
+                    return False
+        return True
+
+    def dispatch(self, context: Context) -> Optional[Dict]:
+        for stage in self.order:
+            if stage.prefilter is not None and not stage.prefilter(context):
+                continue
+            result = stage.run(context)
+            if result is not None:
+                return result
+        return None
+
+    def profile(self, contexts: Iterable[Context], clock=time.perf_counter) -> Dict[str, StageStats]:
+        """
+        Run every stage (in priority order, without stopping at the first
+        answer) on each context and tally its cost and hit rate. Each stage
+        starts from an empty memo, so it is charged its own full cost.
+
+        Also checks the group declarations: two stages of a group answering
+        the same message raise ValueError, since reordering them would then
+        change the answer.
+        """
+        totals = {stage.name: [0, 0, 0, 0.0] for stage in self.stages}
+        for context in contexts:
+            answered = {}
+            for stage in self.stages:
+                context.memo.clear()
+                start = clock()
+                passed = stage.prefilter is None or stage.prefilter(context)
+                hit = passed and stage.run(context) is not None
+                counts = totals[stage.name]
+                counts[0] += 1
+                counts[1] += passed
+                counts[2] += hit
+                counts[3] += clock() - start
+                if hit and stage.group is not None:
+                    other = answered.setdefault(stage.group, stage.name)
+                    if other != stage.name:
+                        raise ValueError(f"Stages {other} and {stage.name} of group {stage.group!r} "
+                                         f"both answer {context.utterance.text!r}")
+        return {name: StageStats(*counts) for name, counts in totals.items()}
+
+    def measured_order(self, stats: Dict[str, StageStats]) -> List[str]:
+        """
+        Priority order, with each run of same-group stages sorted by hit
+        rate per unit of cost: for stages of which at most one answers,
+        that order minimizes the expected time to find the answer.
+        """
+        def efficiency(stage):
+            measured = stats.get(stage.name)
+            if measured is None or not measured.hits:
+                return 0.0
+            return measured.hit_rate / max(measured.cost, 1e-9)
+
+        order: List[str] = []
+        for _, run in groupby(self.stages, key=lambda stage: stage.group or ('stage', stage.name)):
+            order.extend(stage.name for stage in sorted(run, key=efficiency, reverse=True))
+        return order
+
+    def reordered(self, stats: Dict[str, StageStats]) -> 'Cascade':
+        """The same stages, dispatched in measured_order(stats)"""
+        return Cascade(self.stages, self.measured_order(stats))
@@ -0,0 +1,105 @@
+"""
+Incremental dialogue-state tracking for the admission process
+
+The admission process is a fixed sequence of steps. Some steps are stages
+the user can report having completed (application_form -> health_form ->
+registration -> interview_completed -> marks_received). The tracker keeps
+the stage the conversation is currently about and advances it once per
+incoming message, so answering "what next?" is a lookup instead of a rescan
+of the conversation history.
+
+The same graph produces the /api/chatbot/process-flow steps.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence
+
+# How far back the legacy conversationHistory payload is considered
+HISTORY_WINDOW = 5
+CATEGORY_WINDOW = 3
+
+
+class DialogueGraph:
+    """
+    Ordered admission steps.
+
+    Each step is a dict with "name" and "description". Steps the user can
+    complete also carry "stage" (the next_steps key) and "entity" (the
+    entity that, when mentioned, puts the conversation at that stage).
+    """
+
+    def __init__(self, steps: Sequence[Dict]):
+        self.steps = list(steps)
+        self.stages: List[str] = [step["stage"] for step in self.steps if step.get("stage")]
+        self.entity_stages: Dict[str, str] = {
+            step["entity"]: step["stage"] for step in self.steps if step.get("entity")
+        }
+
+    def process_flow(self) -> List[Dict]:
+        """Numbered steps for the process-flow endpoint"""
+        return [
+            {"step": number, "name": step["name"], "description": step["description"]}
+            for number, step in enumerate(self.steps, start=1)
+        ]
+
+
+def new_dialogue_state() -> Dict:
+    return {"last_stage": None, "stage_entity": None, "last_category": None}
+
+
+class DialogueTracker:
+    """
+    Per-session state machine over the graph's stages.
+
+    State is a plain dict (it lives inside the session store entry):
+    - last_stage: stage the conversation is at
+    - stage_entity: entity that set last_stage, or None when the user
+      stated the completion explicitly
+    - last_category: category of the last answer, for "more info" follow-ups
+    """
+
+    def __init__(self, graph: DialogueGraph,
+                 detect_stage: Callable[[str], Optional[str]],
+                 detect_entities: Callable[[str], List[str]]):
+        self.graph = graph
+        self._detect_stage = detect_stage
+        self._detect_entities = detect_entities
+
+    def advance(self, state: Dict, user_message: str, category: Optional[str] = None) -> Dict:
+        """Fold one incoming message (and the category it was answered with) into state"""
+        text = user_message.lower()
+        stage = self._detect_stage(text)
+        if stage:
+            state["last_stage"] = stage
+            state["stage_entity"] = None
+        else:
+            for entity in self._detect_entities(text):
+                if entity in self.graph.entity_stages:
+                    state["last_stage"] = self.graph.entity_stages[entity]
+                    state["stage_entity"] = entity
+                    break
+        if category is not None:
+            state["last_category"] = category
+        return state
+
+    def from_history(self, conversation_history: Optional[List[Dict]]) -> Dict:
+        """Build a state from a client-supplied conversationHistory payload"""
+        state = new_dialogue_state()
+        if not conversation_history or not isinstance(conversation_history, list):
+            return state
+        # Entries that are not objects are ignored, as a malformed payload
+        # must not fail the request
+        history = [msg for msg in conversation_history if isinstance(msg, dict)]
+        for msg in history[-HISTORY_WINDOW:]:
+            if msg.get('role') == 'user':
+                self.advance(state, str(msg.get('message') or ''))
+        for msg in reversed(history[-CATEGORY_WINDOW:]):
+            if msg.get('role') == 'assistant':
+                category = msg.get('category')
+                state["last_category"] = category if isinstance(category, str) else None
+                break
+        return state
+
+    @staticmethod
+    def signature(state: Dict) -> tuple:
+        """Hashable summary of a state, for the response cache key"""
+        return (state.get("last_stage"), state.get("stage_entity"), state.get("last_category"))
@@ -1,6 +1,9 @@
-import nltk
-nltk.download('punkt', download_dir='nltk_data')
-nltk.download('wordnet', download_dir='nltk_data')
-
-nltk.download('punkt_tab', download_dir='nltk_data')
-nltk.download('stopwords', download_dir='nltk_data')
+import nltk
+
+from nltk_resources import NLTK_DATA_DIR
+
+nltk.download('punkt', download_dir=NLTK_DATA_DIR)
+nltk.download('wordnet', download_dir=NLTK_DATA_DIR)
+
+nltk.download('punkt_tab', download_dir=NLTK_DATA_DIR)
+nltk.download('stopwords', download_dir=NLTK_DATA_DIR)
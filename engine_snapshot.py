@@ -0,0 +1,123 @@
+"""
+Serialized engine snapshot for fast cold starts
+
+Building the engine (keyword automaton, TF-IDF/BM25 indexes, spelling
+dictionary, topics payload) takes tens of milliseconds on every boot.
+This build step does it once and pickles the resulting KnowledgeSnapshot
+into a single file; ChatbotEngine unpickles it at boot instead.
+
+The file starts with a small header that is checked before the payload is
+read. The snapshot is used only when the header matches all of these:
+- the snapshot format
+- the Python and NumPy versions
+- a hash of the knowledge base file
+- a hash of every top-level module of the app (the indexes are built,
+  and their pickled classes defined, across most of them)
+Otherwise (or when the file is missing or unreadable) the engine rebuilds
+from the knowledge base as usual.
+
+The snapshot is a build artifact produced from trusted sources, like the
+code itself; never point ENGINE_SNAPSHOT_PATH at a file from elsewhere.
+
+Usage: python -m engine_snapshot [--output PATH]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of KnowledgeSnapshot or of a pickled index changes
+SNAPSHOT_FORMAT = 2
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, 'engine_snapshot.pickle')
+
+
+def snapshot_path() -> Optional[str]:
+    """ENGINE_SNAPSHOT_PATH, or the default; an empty value disables snapshots"""
+    path = os.environ.get('ENGINE_SNAPSHOT_PATH', DEFAULT_PATH)
+    return path or None
+
+
+def source_modules() -> List[str]:
+    """Every top-level module of the app: a hand-kept list misses indirect imports"""
+    return sorted(name for name in os.listdir(BASE_DIR) if name.endswith('.py'))
+
+
+def code_fingerprint() -> str:
+    digest = hashlib.sha1()
+    for name in source_modules():
+        digest.update(name.encode('utf-8') + b'\0')
+        with open(os.path.join(BASE_DIR, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def snapshot_header(knowledge_base_digest: str) -> Dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "python": sys.version_info[:2],
+        "numpy": np.__version__,
+        "knowledge_base": knowledge_base_digest,
+        "code": code_fingerprint(),
+    }
+
+
+def write_snapshot(path: str, snapshot, knowledge_base_digest: str) -> None:
+    """Write header + snapshot atomically (temp file, then rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix='.engine_snapshot.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(snapshot_header(knowledge_base_digest), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_snapshot(path: str, knowledge_base_digest: str):
+    """The pickled snapshot, or None if it is missing, stale or unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            header = pickle.load(f)
+            expected = snapshot_header(knowledge_base_digest)
+            if header != expected:
+                stale = sorted(key for key in expected if header.get(key) != expected[key])
+                logger.info("Engine snapshot %s is stale (%s); rebuilding", path, ', '.join(stale))
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Engine snapshot %s is unreadable; rebuilding", path, exc_info=True)
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the serialized engine snapshot")
+    parser.add_argument('--output', default=snapshot_path() or DEFAULT_PATH)
+    args = parser.parse_args()
+
+    # Build from the knowledge base, not from an existing snapshot
+    os.environ['ENGINE_SNAPSHOT_PATH'] = ''
+    start = time.perf_counter()
+    from app import chatbot
+    write_snapshot(args.output, chatbot.snapshot, chatbot.source.digest())
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB, "
+          f"knowledge base version {chatbot.snapshot.version}) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+State that is safe to create before gunicorn --preload forks
+
+A lock some thread holds when the process forks stays held forever in
+the child, where that thread does not exist. fork_safe_lock() returns a
+plain threading.Lock and remembers its owner (weakly): in every forked
+child, the owner's attribute is set to a fresh, unlocked lock. Objects
+with more per-process state register a method to call in the child
+instead, with reset_after_fork(). One fork hook serves every owner, and
+an owner that is garbage collected is simply forgotten.
+"""
+
+import os
+import threading
+import weakref
+
+# owner -> names of its lock attributes
+_owners: 'weakref.WeakKeyDictionary[object, set]' = weakref.WeakKeyDictionary()
+# owner -> names of its methods to call in the child
+_resets: 'weakref.WeakKeyDictionary[object, set]' = weakref.WeakKeyDictionary()
+
+
+def fork_safe_lock(owner, attribute: str = '_lock') -> threading.Lock:
+    """A new lock for owner.<attribute>, replaced in every forked child while owner lives"""
+    _owners.setdefault(owner, set()).add(attribute)
+    return threading.Lock()
+
+
+def reset_after_fork(owner, method: str) -> None:
+    """Call owner.<method>() in every forked child while owner lives"""
+    _resets.setdefault(owner, set()).add(method)
+
+
+def _after_fork_in_child():
+    for owner, attributes in list(_owners.items()):
+        for attribute in attributes:
+            setattr(owner, attribute, threading.Lock())
+    for owner, methods in list(_resets.items()):
+        for method in methods:
+            getattr(owner, method)()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
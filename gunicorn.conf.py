@@ -0,0 +1,47 @@
+"""
+Gunicorn settings, read from the working directory by `gunicorn app:app`
+
+Threaded workers: an open WebSocket (/api/chatbot/ws) holds a thread
+until it closes, and with sync workers a few idle browser tabs would hold
+every worker. Command-line options override these.
+
+With --preload, the master builds the engine once and the hooks below
+keep its pages shared with the workers (see PRELOAD in app.py).
+
+Environment:
+- WEB_CONCURRENCY: worker processes (gunicorn's own default: 1)
+- GUNICORN_THREADS: threads per worker (default 8)
+- PRELOAD_WARM_UP=0: skip the warm-up requests before forking
+
+When the master exits, it removes its workers' metrics directory (unless
+METRICS_DIR chose one).
+"""
+
+import gc
+import os
+import shutil
+
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+PRELOAD_WARM_UP = os.environ.get('PRELOAD_WARM_UP', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+def when_ready(server):
+    if server.cfg.preload_app and PRELOAD_WARM_UP:
+        # Already imported by the master; this does not load the app
+        from app import warm_up
+        warm_up()
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        # Also before replacing a worker, for whatever the master built since
+        gc.freeze()
+
+
+def on_exit(server):
+    if not os.environ.get('METRICS_DIR'):
+        # The workers' default metrics directory (see metrics.py) belongs to this master
+        from metrics import gunicorn_directory
+        shutil.rmtree(gunicorn_directory(os.getpid()), ignore_errors=True)
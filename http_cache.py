@@ -0,0 +1,222 @@
+"""
+Pre-encoded, cacheable JSON responses for the read-only GET endpoints
+
+/topics, /help/<topic>, /process-flow and /greeting only change when the
+knowledge base does. Their JSON is encoded (and gzip/brotli compressed)
+once per knowledge base version and served with:
+- a strong ETag per representation, and 304 Not Modified when the
+  client's If-None-Match already has it
+- Cache-Control, so browsers and the CDN can reuse the body
+- Vary: Accept-Encoding, and the compressed body the client accepts
+The time of the response moves to an X-Timestamp header, so it no longer
+makes every body different.
+
+Brotli is used when the optional brotli package is installed.
+
+/api/chatbot/message answers are nearly always one of a fixed set of
+strings (knowledge base responses, next steps, help text), but the
+envelope around them differs per request. Each of those strings is
+deflated once, as an AnswerFragment; a gzip response is then assembled
+from the freshly deflated envelope parts and the cached fragment, so a
+request only compresses its few hundred bytes of envelope. (Brotli
+streams cannot be joined like that, so these responses use gzip.)
+
+Uncompressed envelopes are encoded whole: splicing the pre-escaped
+answer into them measured no faster than escaping it again (see
+benchmarks/bench_serialization.py), while the encoder itself matters.
+dumps() uses orjson when it is installed, and otherwise one reused
+stdlib encoder instead of jsonify's per-call setup.
+"""
+
+import gzip
+import hashlib
+import json
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional
+
+from flask import Response
+
+from fork_safety import fork_safe_lock
+
+try:
+    import brotli  # optional; gzip only without it
+except ImportError:
+    brotli = None
+
+try:
+    import orjson  # optional; a faster encoder for the same JSON
+except ImportError:
+    orjson = None
+
+
+# json.dumps builds a new encoder per call when given options
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON (non-ASCII characters are not escaped)"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return _ENCODER.encode(value).encode('utf-8')
+
+
+def gzip_bytes(body: bytes) -> bytes:
+    # mtime=0 keeps the output (and its ETag) identical across workers
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(body: bytes) -> Optional[bytes]:
+    return brotli.compress(body, quality=11) if brotli is not None else None
+
+
+class EncodedBody(NamedTuple):
+    """One JSON body in every encoding it is served in"""
+    identity: bytes
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+    etag: str               # of the identity body; encoded variants add a suffix
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> 'EncodedBody':
+        body = dumps(payload)
+        compressed = gzip_bytes(body)
+        br = brotli_bytes(body)
+        return cls(
+            body,
+            compressed if len(compressed) < len(body) else None,
+            br if br is not None and len(br) < len(body) else None,
+            hashlib.sha1(body).hexdigest()[:20],
+        )
+
+    def variant(self, accept_encodings) -> tuple:
+        """(content encoding or None, body, ETag) for an Accept-Encoding header"""
+        if self.br is not None and accept_encodings['br']:
+            return 'br', self.br, f'"{self.etag}-br"'
+        if self.gzip is not None and accept_encodings['gzip']:
+            return 'gzip', self.gzip, f'"{self.etag}-gz"'
+        return None, self.identity, f'"{self.etag}"'
+
+    def etags(self) -> frozenset:
+        return frozenset({f'"{self.etag}"', f'"{self.etag}-gz"', f'"{self.etag}-br"'})
+
+
+class EncodedPayloads:
+    """
+    EncodedBody per (endpoint, key), built on first use and dropped when
+    the knowledge base version changes.
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self._bodies: Dict[tuple, EncodedBody] = {}
+        self._lock = fork_safe_lock(self)
+
+    def get(self, key: Hashable, version: str, build: Callable[[], Any]) -> EncodedBody:
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._bodies = {}
+                    self.version = version
+        # Keyed on the version too, so a request still building from the
+        # previous version cannot store its body under the new one
+        encoded = self._bodies.get((version, key))
+        if encoded is None:
+            # Two threads may both build it; the bodies are identical
+            encoded = self._bodies[(version, key)] = EncodedBody.from_payload(build())
+        return encoded
+
+
+def cached_json_response(encoded: EncodedBody, request, max_age: int) -> Response:
+    """200 with the best accepted encoding, or 304 if the client has it already"""
+    encoding, body, etag = encoded.variant(request.accept_encodings)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={max_age}',
+        'Vary': 'Accept-Encoding',
+        'X-Timestamp': datetime.now().isoformat(),
+    }
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (if_none_match.strip() == '*' or not encoded.etags().isdisjoint(
+            tag.strip().removeprefix('W/') for tag in if_none_match.split(','))):
+        return Response(status=304, headers=headers)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(body, status=200, headers=headers, content_type='application/json')
+
+
+# Member header: deflate, no flags, mtime 0, unknown OS
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+
+
+class AnswerFragment(NamedTuple):
+    """An answer as a JSON string literal, plain and as raw deflate blocks"""
+    json: bytes
+    deflated: bytes     # ends byte-aligned, without a final block, so more data can follow
+
+
+def deflate_part(data: bytes, level: int = 9) -> bytes:
+    """Raw deflate blocks for data, ending byte-aligned without a final block"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def stored_part(data: bytes, final: bool = False) -> bytes:
+    """
+    data as uncompressed ("stored") deflate blocks. The envelope around an
+    answer is a few hundred mostly unique bytes: compressing it would save
+    a few dozen bytes but cost far more than the answer's splicing saves
+    (setting up a compressor alone takes tens of microseconds).
+    """
+    blocks = []
+    for start in range(0, len(data), 0xffff):
+        chunk = data[start:start + 0xffff]
+        last = final and start + 0xffff >= len(data)
+        blocks.append(b'\x01' if last else b'\x00')
+        blocks.append(struct.pack('<HH', len(chunk), len(chunk) ^ 0xffff))
+        blocks.append(chunk)
+    if final and not data:
+        blocks.append(b'\x01\x00\x00\xff\xff')
+    return b''.join(blocks)
+
+
+def answer_fragments(answers: Iterable[str]) -> Dict[str, AnswerFragment]:
+    """Answer text -> AnswerFragment, for every distinct answer"""
+    fragments = {}
+    for answer in answers:
+        if answer not in fragments:
+            encoded = dumps(answer)
+            fragments[answer] = AnswerFragment(encoded, deflate_part(encoded))
+    return fragments
+
+
+def envelope_parts(payload: Dict, key: str) -> tuple:
+    """JSON of payload cut around the value of key: (bytes before it, bytes after it)"""
+    keys = list(payload)
+    index = keys.index(key)
+    before = dumps({k: payload[k] for k in keys[:index]})[:-1] + b',' if index else b'{'
+    before += dumps(key) + b':'
+    after = b',' + dumps({k: payload[k] for k in keys[index + 1:]})[1:] if index + 1 < len(keys) else b'}'
+    return before, after
+
+
+def gzip_splice(before: bytes, fragment: AnswerFragment, after: bytes) -> bytes:
+    """
+    gzip of before + fragment.json + after, reusing fragment.deflated.
+
+    A deflate stream may be cut into byte-aligned runs of blocks, and
+    each run may be compressed on its own (its back-references stay
+    inside it), so the envelope parts, as stored blocks, and the
+    fragment are simply concatenated. Only the CRC-32 has to run over
+    the fragment's bytes, which is far cheaper than compressing them.
+    """
+    crc = zlib.crc32(after, zlib.crc32(fragment.json, zlib.crc32(before)))
+    size = len(before) + len(fragment.json) + len(after)
+    return b''.join((
+        GZIP_HEADER,
+        stored_part(before),
+        fragment.deflated,
+        stored_part(after, final=True),
+        struct.pack('<II', crc, size & 0xffffffff),
+    ))
@@ -0,0 +1,109 @@
+"""
+Aho-Corasick keyword automaton for the knowledge base keyword fallback
+
+The automaton is built once from every category's keywords. A single pass
+over the input finds every keyword it contains, so the fallback no longer
+costs categories x keywords substring scans per message.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern substring matcher over the KNOWLEDGE_BASE keywords.
+
+    Scoring matches the old fallback loop: every keyword of a category that
+    occurs in the input adds len(keyword.split()) * 2, counted once per
+    keyword entry no matter how often it occurs in the text.
+    """
+
+    def __init__(self, keywords: Dict[str, Sequence[str]]):
+        self.categories: List[str] = list(keywords)
+
+        # pattern id -> list of (category index, weight); a keyword listed
+        # twice, or in two categories, scores for every listing
+        self._weights: List[List[Tuple[int, int]]] = []
+        pattern_ids: Dict[str, int] = {}
+
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for category_index, category in enumerate(self.categories):
+            for keyword in keywords[category]:
+                pattern = keyword.lower()
+                if not pattern:
+                    continue
+                weight = len(pattern.split()) * 2
+                if pattern not in pattern_ids:
+                    pattern_ids[pattern] = len(self._weights)
+                    self._weights.append([])
+                    state = 0
+                    for char in pattern:
+                        next_state = self._goto[state].get(char)
+                        if next_state is None:
+                            next_state = len(self._goto)
+                            self._goto[state][char] = next_state
+                            self._goto.append({})
+                            outputs.append([])
+                        state = next_state
+                    outputs[state].append(pattern_ids[pattern])
+                self._weights[pattern_ids[pattern]].append((category_index, weight))
+
+        # Breadth-first pass for failure links; each state's output list
+        # absorbs the outputs of its failure state so search never walks
+        # the failure chain to report matches
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state].extend(outputs[self._fail[next_state]])
+
+        self._outputs = [tuple(out) for out in outputs]
+        self.pattern_count = len(self._weights)
+
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base: Dict) -> 'KeywordAutomaton':
+        return cls({category: data["keywords"] for category, data in knowledge_base.items()})
+
+    def find(self, text: str) -> set:
+        """Return the ids of every keyword occurring in text (one pass)"""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Return the keyword score of every category with at least one hit"""
+        totals = [0] * len(self.categories)
+        for pattern_id in self.find(text):
+            for category_index, weight in self._weights[pattern_id]:
+                totals[category_index] += weight
+        return {self.categories[i]: score for i, score in enumerate(totals) if score}
+
+    def best_match(self, text: str) -> Tuple[Optional[str], int]:
+        """Return (category, score) of the best scoring category, or (None, 0)
+
+        Ties go to the category listed first, like the old loop.
+        """
+        best_match = None
+        max_score = 0
+        for category, score in self.scores(text).items():
+            if score > max_score:
+                max_score = score
+                best_match = category
+        return best_match, max_score
@@ -0,0 +1,143 @@
+"""
+Knowledge base data file: loading, validation and change detection
+
+The answers live in knowledge_base.json (or a YAML file with the same
+shape, when PyYAML is installed) instead of a Python literal, so editing
+an answer does not need a redeploy:
+
+    {"<category>": {"keywords": [...], "responses": [...]}, ...}
+
+KnowledgeBaseFile remembers the mtime/size of the version it loaded and
+tells, with at most one stat() per poll interval, whether the file has
+changed since. ChatbotEngine rebuilds its indexes from the new content
+off the request path and swaps them in as one KnowledgeSnapshot.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from fork_safety import fork_safe_lock
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge_base.json')
+
+
+def knowledge_base_path() -> str:
+    return os.environ.get('KNOWLEDGE_BASE_PATH', DEFAULT_PATH)
+
+
+def validate_knowledge_base(knowledge_base: Any) -> Dict:
+    """Check the {"category": {"keywords": [...], "responses": [...]}} shape"""
+    if not isinstance(knowledge_base, dict) or not knowledge_base:
+        raise ValueError("Knowledge base must be a non-empty object of categories")
+    for category, data in knowledge_base.items():
+        if not isinstance(data, dict):
+            raise ValueError(f"Knowledge base category {category!r} must be an object")
+        for field in ("keywords", "responses"):
+            values = data.get(field)
+            if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+                raise ValueError(f"Knowledge base category {category!r}: {field} must be a list of strings")
+        if not data["responses"]:
+            raise ValueError(f"Knowledge base category {category!r} has no responses")
+    return knowledge_base
+
+
+def load_knowledge_base(path: Optional[str] = None) -> Dict:
+    """Read and validate a JSON (or, with PyYAML, YAML) knowledge base file"""
+    path = path or knowledge_base_path()
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml  # optional; only needed for YAML knowledge bases
+            knowledge_base = yaml.safe_load(f)
+        else:
+            knowledge_base = json.load(f)
+    return validate_knowledge_base(knowledge_base)
+
+
+class KnowledgeSnapshot(NamedTuple):
+    """
+    Everything derived from one version of the knowledge base.
+
+    The engine holds a single reference to the current snapshot; a request
+    reads it once and uses that snapshot throughout, so a reload (which
+    replaces the reference) is never seen half-applied.
+    """
+    version: str
+    knowledge_base: Dict
+    keyword_automaton: Any
+    tfidf_index: Any
+    bm25_index: Any
+    spelling: Any
+    topics: Tuple[Dict, ...]   # /api/chatbot/topics payload
+    answer_fragments: Dict     # answer text -> http_cache.AnswerFragment
+
+
+def topic_name(category: str) -> str:
+    """'applicationFormDetails' -> 'Application Form Details'"""
+    return re.sub(r'([A-Z])', r' \1', category).strip().title()
+
+
+def topic_summaries(knowledge_base: Dict) -> List[Dict]:
+    return [
+        {
+            "id": key,
+            "name": topic_name(key),
+            "keywords": data["keywords"],
+            "response_count": len(data["responses"])
+        }
+        for key, data in knowledge_base.items()
+    ]
+
+
+class KnowledgeBaseFile:
+    """Change detection on the knowledge base file, throttled to one stat per interval"""
+
+    def __init__(self, path: Optional[str] = None, poll_interval: float = 2.0, clock=time.monotonic):
+        self.path = path or knowledge_base_path()
+        self.poll_interval = poll_interval
+        self._clock = clock
+        self._loaded: Optional[Tuple[float, int]] = None
+        self._next_check = 0.0
+        self._lock = fork_safe_lock(self)
+
+    def _signature(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def digest(self) -> str:
+        """Content hash of the file as it is now, marking that version as loaded"""
+        signature = self._signature()
+        with open(self.path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        self._loaded = signature
+        return digest
+
+    def load(self) -> Dict:
+        """Read the file and remember which version was read"""
+        signature = self._signature()
+        try:
+            return load_knowledge_base(self.path)
+        finally:
+            # A broken file is remembered too, so it is not retried on
+            # every poll; the next save retriggers the reload
+            self._loaded = signature
+
+    def changed(self) -> bool:
+        """True when the file differs from the loaded version (checked at most once per interval)"""
+        if self.poll_interval <= 0:
+            return False
+        now = self._clock()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = now + self.poll_interval
+            signature = self._signature()
+            return signature is not None and signature != self._loaded
+        finally:
+            self._lock.release()
@@ -0,0 +1,262 @@
+"""
+Per-stage instrumentation of find_best_response, in Prometheus text format
+
+Every answer is recorded with the cascade stage that produced it:
+- chatbot_answers_total{stage, cached}: answers per stage, and whether
+  they came from the response cache
+- chatbot_stage_latency_seconds{stage}: find_best_response latency
+  histogram; cache hits are recorded under stage="response_cache"
+- chatbot_answer_categories_total{category, intent}: what was answered
+- chatbot_response_cache_requests_total{result}: response cache hits and
+  misses
+
+Recording is a few dict updates under a lock, cheap enough to leave on.
+
+Gunicorn workers are separate processes, so each worker also writes its
+counters to <directory>/metrics-<pid>.json (at most once per flush
+interval) and a scrape of /api/metrics, whichever worker serves it, sums
+the files of all workers. The directory is METRICS_DIR or, under
+gunicorn, <tmp>/chatbot-metrics-<master pid> by default, so the workers
+of one master always share one and a restarted service starts from zero.
+Counters of workers that exited are kept, as Prometheus counters must not
+go backwards. The on_exit hook in gunicorn.conf.py removes the default
+directory when the master exits; empty METRICS_DIR yourself when the
+service is redeployed (or a master is killed before its hook runs).
+"""
+
+import bisect
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fork_safety import reset_after_fork
+
+# Upper bounds in seconds; the cascade answers in tens to hundreds of us
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+
+COURTESY = frozenset({"greeting", "gratitude", "farewell"})
+INTENT_STAGES = {
+    "continuation_from_context": "vague_context",
+    "completion_with_next_question": "completion_next",
+    "completion_stated": "completion",
+    "next_step_from_context": "next_step",
+    "next_step_from_entity_context": "next_step",
+    "next_step_needs_context": "next_step",
+    "topic_question": "topic_regex",
+    "keyword_match": "keyword",
+    "retrieval_match": "tfidf",
+    "bm25_match": "bm25",
+    "general_help": "fallback",
+}
+
+
+def stage_of(result: Dict) -> str:
+    """Name of the cascade stage that produced a find_best_response result"""
+    category = result["category"]
+    if category == "off-topic":
+        return "off_topic"
+    if category in COURTESY:
+        return "courtesy"
+    if category == "empty":
+        return "empty"
+    intent = result.get("intent") or ""
+    if intent.startswith("semantic_"):
+        return "semantic"
+    return INTENT_STAGES.get(intent, intent or "unknown")
+
+
+def new_state() -> Dict:
+    return {"answers": {}, "categories": {}, "cache": {"hit": 0, "miss": 0}, "latency": {}}
+
+
+def merge_states(states: List[Dict]) -> Dict:
+    """Sum the counters of several workers"""
+    total = new_state()
+    for state in states:
+        for family in ("answers", "categories"):
+            for key, value in state.get(family, {}).items():
+                total[family][key] = total[family].get(key, 0) + value
+        for key, value in state.get("cache", {}).items():
+            total["cache"][key] = total["cache"].get(key, 0) + value
+        for stage, histogram in state.get("latency", {}).items():
+            merged = total["latency"].setdefault(stage, {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0})
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], histogram["buckets"])]
+            merged["sum"] += histogram["sum"]
+    return total
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Label values are joined into one string key so the state stays JSON
+SEPARATOR = '\x1f'
+
+
+def render(state: Dict, workers: int = 1) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = [
+        "# HELP chatbot_answers_total Answers by cascade stage and response cache use.",
+        "# TYPE chatbot_answers_total counter",
+    ]
+    for key, value in sorted(state["answers"].items()):
+        stage, cached = key.split(SEPARATOR)
+        lines.append(f'chatbot_answers_total{{stage="{_escape(stage)}",cached="{cached}"}} {value}')
+
+    lines += [
+        "# HELP chatbot_stage_latency_seconds find_best_response latency by answering stage.",
+        "# TYPE chatbot_stage_latency_seconds histogram",
+    ]
+    for stage, histogram in sorted(state["latency"].items()):
+        label = _escape(stage)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), histogram["buckets"]):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'chatbot_stage_latency_seconds_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'chatbot_stage_latency_seconds_sum{{stage="{label}"}} {histogram["sum"]:.9f}')
+        lines.append(f'chatbot_stage_latency_seconds_count{{stage="{label}"}} {cumulative}')
+
+    lines += [
+        "# HELP chatbot_answer_categories_total Answers by category and intent.",
+        "# TYPE chatbot_answer_categories_total counter",
+    ]
+    for key, value in sorted(state["categories"].items()):
+        category, intent = key.split(SEPARATOR)
+        lines.append(f'chatbot_answer_categories_total{{category="{_escape(category)}",intent="{_escape(intent)}"}} {value}')
+
+    lines += [
+        "# HELP chatbot_response_cache_requests_total Response cache lookups.",
+        "# TYPE chatbot_response_cache_requests_total counter",
+    ]
+    for result, value in sorted(state["cache"].items()):
+        lines.append(f'chatbot_response_cache_requests_total{{result="{result}"}} {value}')
+
+    lines += [
+        "# HELP chatbot_metrics_workers Worker processes whose metrics are included.",
+        "# TYPE chatbot_metrics_workers gauge",
+        f"chatbot_metrics_workers {workers}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class Metrics:
+    """Counters of one process, optionally shared with other workers through a directory"""
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0, clock=time.monotonic,
+                 gunicorn: bool = False):
+        self.directory = directory
+        # Without a directory, share gunicorn_directory() with the other workers
+        self._gunicorn = gunicorn and not directory
+        self.flush_interval = flush_interval
+        self._clock = clock
+        # (category, intent, cached) -> counter keys; a small, bounded set
+        self._keys: Dict[tuple, tuple] = {}
+        self._reset()
+        # Counts of the parent belong to the parent, not to forked workers
+        reset_after_fork(self, '_reset')
+
+    def _reset(self):
+        if self._gunicorn:
+            # Also runs in every forked worker, whose parent is the master
+            self.directory = gunicorn_directory()
+        self._lock = threading.Lock()
+        self._state = new_state()
+        self._next_flush = 0.0
+
+    @staticmethod
+    def _label_keys(result: Dict, cached: bool) -> tuple:
+        stage = stage_of(result)
+        return (
+            stage + SEPARATOR + ('1' if cached else '0'),
+            result["category"] + SEPARATOR + (result.get("intent") or ""),
+            "response_cache" if cached else stage,
+        )
+
+    def observe(self, result: Dict, seconds: float, cached: bool) -> None:
+        """Record one find_best_response answer"""
+        labels = (result["category"], result.get("intent"), cached)
+        keys = self._keys.get(labels)
+        if keys is None:
+            keys = self._keys[labels] = self._label_keys(result, cached)
+        answer_key, category_key, latency_stage = keys
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        state = self._state
+        with self._lock:
+            answers = state["answers"]
+            answers[answer_key] = answers.get(answer_key, 0) + 1
+            categories = state["categories"]
+            categories[category_key] = categories.get(category_key, 0) + 1
+            state["cache"]["hit" if cached else "miss"] += 1
+            histogram = state["latency"].get(latency_stage)
+            if histogram is None:
+                histogram = state["latency"][latency_stage] = {
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0
+                }
+            histogram["buckets"][bucket] += 1
+            histogram["sum"] += seconds
+        if self.directory and self._clock() >= self._next_flush:
+            self.flush()
+
+    def snapshot(self) -> Dict:
+        """Copy of this process's counters"""
+        with self._lock:
+            return json.loads(json.dumps(self._state))
+
+    def flush(self) -> None:
+        """Write this worker's counters to the shared directory (atomically)"""
+        self._next_flush = self._clock() + self.flush_interval
+        state = self.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.metrics.', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp, os.path.join(self.directory, f'metrics-{os.getpid()}.json'))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def collect(self) -> List[Dict]:
+        """Counters of every worker (this one's current, the others' last flush)"""
+        if not self.directory:
+            return [self.snapshot()]
+        self.flush()
+        states = []
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # removed or replaced while listing
+        return states
+
+    def render(self) -> str:
+        states = self.collect()
+        return render(merge_states(states), workers=len(states))
+
+
+def under_gunicorn() -> bool:
+    # Set by the gunicorn master before it loads the app
+    return os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn/')
+
+
+def gunicorn_directory(master_pid: Optional[int] = None) -> str:
+    """Directory shared by the workers of a gunicorn master (by default, this process's parent)"""
+    return os.path.join(tempfile.gettempdir(), f'chatbot-metrics-{master_pid or os.getppid()}')
+
+
+def create_metrics() -> Optional[Metrics]:
+    """Metrics configured from METRICS_ENABLED (default on) and METRICS_DIR"""
+    if os.environ.get('METRICS_ENABLED', '1').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    directory = os.environ.get('METRICS_DIR') or None
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return Metrics(directory, flush_interval=float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0)),
+                   gunicorn=under_gunicorn())
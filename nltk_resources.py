@@ -0,0 +1,78 @@
+"""
+Offline, lazy NLTK corpus loader
+
+Nothing here touches the network. Corpora are read from the bundled
+nltk_data directory prepared by dw.py, and only the first time a pipeline
+stage actually needs tokens, stopwords or the lemmatizer. Importing this
+module does not even import nltk.
+
+Environment:
+- NLTK_DATA_DIR: bundled data directory (default: ./nltk_data next to app.py)
+- NLTK_OFFLINE=1: search only NLTK_DATA_DIR, ignoring the user/system
+  nltk_data locations
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+NLTK_DATA_DIR = os.environ.get(
+    'NLTK_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+)
+NLTK_OFFLINE = os.environ.get('NLTK_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+# Used when the punkt tokenizer models are not bundled
+_FALLBACK_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=None)
+def _nltk():
+    """Import nltk and point it at the bundled data directory (once)"""
+    import nltk
+
+    if NLTK_OFFLINE:
+        nltk.data.path[:] = [NLTK_DATA_DIR]
+    elif NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    return nltk
+
+
+@lru_cache(maxsize=None)
+def _tokenizer():
+    _nltk()
+    from nltk.tokenize import word_tokenize
+    try:
+        # Loads punkt / punkt_tab, whichever this nltk version uses
+        word_tokenize('warm up')
+    except LookupError:
+        logger.warning("punkt models not found in %s, using the regex tokenizer (run dw.py)", NLTK_DATA_DIR)
+        return _FALLBACK_TOKEN_RE.findall
+    return word_tokenize
+
+
+def word_tokenize(text):
+    """Tokenize text, loading the punkt models on first use"""
+    return _tokenizer()(text)
+
+
+@lru_cache(maxsize=None)
+def stop_words():
+    """English stopword set, loaded on first use"""
+    _nltk()
+    from nltk.corpus import stopwords
+    try:
+        return frozenset(stopwords.words('english'))
+    except LookupError:
+        logger.warning("stopwords corpus not found in %s (run dw.py)", NLTK_DATA_DIR)
+        return frozenset()
+
+
+@lru_cache(maxsize=None)
+def lemmatizer():
+    """WordNet lemmatizer; WordNet itself is read on the first lemmatize() call"""
+    _nltk()
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
@@ -0,0 +1,147 @@
+"""
+Precompiled regex registry for the chatbot engine
+
+Every pattern tier the engine checks on a message is compiled once, when the
+engine is constructed. The patterns of a tier are merged into a single regex
+with one named group per entry, so checking a tier costs one scan instead of
+one re.search call per pattern.
+
+When every pattern of a tier starts with a literal word (r'\\bnext.{0,10}step',
+r'\\b(filled|completed).{0,20}form'), the tier also gets a pre-filter: one
+plain alternation of those words, a fraction of the cost of the merged
+lookahead regex. A message the pre-filter rejects cannot match the tier.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+Entries = Union[Dict[str, Sequence[str]], Iterable[Tuple[str, Sequence[str]]]]
+
+# A word boundary (or start of text) followed by a word or a group of words,
+# not made optional by a quantifier
+LEADING_RE = re.compile(r'\\[bA](?:\((?:\?:)?([^()]*)\)|([a-z]+))(?![?*{])')
+WORD_PREFIX_RE = re.compile(r'[a-z]+')
+
+
+def leading_words(pattern: str) -> Optional[Set[str]]:
+    """Words every match of pattern starts with, or None if that cannot be told"""
+    match = LEADING_RE.match(pattern)
+    if match is None:
+        return None
+    if match.group(2):
+        return {match.group(2)}
+    words = set()
+    for alternative in match.group(1).split('|'):
+        word = WORD_PREFIX_RE.match(alternative)
+        if word is None:
+            return None
+        words.add(word.group())
+    return words
+
+
+class PatternTier:
+    """
+    Ordered, labelled group of patterns compiled into one regex.
+
+    Entries keep the priority order they were given in:
+    - first()  -> label of the highest priority entry matching anywhere
+    - matches() -> True if any entry matches
+    - all()    -> labels of every entry that matches, in priority order
+    - may_match() -> False if the pre-filter rules the text out (always
+      True for tiers without one)
+
+    With literal=True the entries are plain substrings (the old
+    `keyword in text` checks). CPython's substring search beats a merged
+    regex for a handful of short literals, so literal tiers are kept as
+    prebuilt tuples instead of being compiled.
+    """
+
+    def __init__(self, name: str, entries: Entries, flags: int = 0, literal: bool = False):
+        self.name = name
+        items = entries.items() if isinstance(entries, dict) else entries
+        self.entries: List[Tuple[str, List[str]]] = [(label, list(patterns)) for label, patterns in items]
+        self.labels = [label for label, _ in self.entries]
+        self.flags = flags
+        self.literal = literal
+        self._prefilter = None
+
+        if literal:
+            self._literals = tuple((index, tuple(patterns)) for index, (_, patterns) in enumerate(self.entries))
+            return
+
+        leading = [leading_words(pattern) for _, patterns in self.entries for pattern in patterns]
+        if leading and None not in leading:
+            words = sorted(set().union(*leading))
+            self._prefilter = re.compile(r'\b(?:' + '|'.join(words) + ')', flags)
+
+        # Each entry becomes a lookahead that scans the whole text, followed
+        # by an empty named group that records which entry fired. Anchoring
+        # the alternation at the start makes the regex engine try entries in
+        # priority order, exactly like the old nested for-loops did.
+        alternatives = []
+        optionals = []
+        for index, (_, patterns) in enumerate(self.entries):
+            body = '|'.join(f'(?:{p})' for p in patterns)
+            lookahead = f'(?=(?s:.*?)(?:{body}))(?P<g{index}>)'
+            alternatives.append(lookahead)
+            optionals.append(f'(?:{lookahead})?')
+
+        self._first = re.compile('(?:' + '|'.join(alternatives) + ')', flags) if alternatives else None
+        self._all = re.compile(''.join(optionals), flags)
+
+    def may_match(self, text: str) -> bool:
+        """Cheap necessary condition for a match: False means no entry can match"""
+        return self._prefilter is None or self._prefilter.search(text) is not None
+
+    def first(self, text: str) -> Optional[str]:
+        """Return the label of the first entry (in priority order) that matches"""
+        if self.literal:
+            for index, literals in self._literals:
+                for literal in literals:
+                    if literal in text:
+                        return self.labels[index]
+            return None
+        if self._first is None:
+            return None
+        match = self._first.match(text)
+        if match is None:
+            return None
+        return self.labels[int(match.lastgroup[1:])]
+
+    def matches(self, text: str) -> bool:
+        """Return True if any entry of the tier matches"""
+        if self.literal:
+            return self.first(text) is not None
+        return self._first is not None and self._first.match(text) is not None
+
+    def all(self, text: str) -> List[str]:
+        """Return the labels of every matching entry, in priority order"""
+        if self.literal:
+            return [self.labels[index] for index, literals in self._literals
+                    if any(literal in text for literal in literals)]
+        match = self._all.match(text)
+        return [self.labels[int(name[1:])] for name, value in match.groupdict().items() if value is not None]
+
+    def __repr__(self):
+        return f"PatternTier({self.name!r}, entries={len(self.entries)})"
+
+
+class PatternRegistry:
+    """Named collection of compiled pattern tiers, built once per engine"""
+
+    def __init__(self):
+        self._tiers: Dict[str, PatternTier] = {}
+
+    def add(self, name: str, entries: Entries, flags: int = 0, literal: bool = False) -> PatternTier:
+        tier = PatternTier(name, entries, flags=flags, literal=literal)
+        self._tiers[name] = tier
+        return tier
+
+    def __getitem__(self, name: str) -> PatternTier:
+        return self._tiers[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tiers
+
+    def __iter__(self):
+        return iter(self._tiers.values())
@@ -0,0 +1,88 @@
+"""
+Bounded LRU/TTL cache in front of ChatbotEngine.find_best_response
+
+Entries are keyed on the normalized message plus a compact signature of
+the conversation context (the dialogue tracker state), so the same
+question in the same context is answered from memory. Cached results keep
+the full candidate set of a knowledge base answer; the engine still picks
+one with random.choice on every hit, so repeated questions keep getting
+varied answers.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fork_safety import fork_safe_lock
+
+
+def knowledge_base_fingerprint(knowledge_base: Dict) -> str:
+    """Content hash of a knowledge base, used as the cache version"""
+    encoded = json.dumps(knowledge_base, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a per-entry time to live"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version: Optional[str] = None
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = fork_safe_lock(self)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        expires = self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version: Optional[str] = None) -> None:
+        """Drop every entry, e.g. because the knowledge base changed"""
+        with self._lock:
+            self._entries.clear()
+            self.version = version
+
+    def reset_stats(self) -> None:
+        """Zero the hit, miss and eviction counters"""
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "version": self.version,
+            }
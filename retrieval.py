@@ -0,0 +1,162 @@
+"""
+Vector retrieval over the knowledge base
+
+TfidfIndex builds one TF-IDF row per knowledge base category (its keywords
+and responses) at startup. A query is scored against every category with a
+single NumPy matrix-vector product, which catches paraphrased questions the
+literal keyword fallback misses.
+
+Bm25Index ranks the same category documents through an inverted index,
+for the top-k search API and as a last retrieval tier.
+"""
+
+import heapq
+import math
+from operator import itemgetter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from utterance import TOKEN_RE
+
+# Function words and conversational filler ("tell me more", "I need
+# information") carry no topic signal; kept local so building the index
+# never has to load the NLTK stopwords corpus
+STOP_WORDS = frozenset("""
+a about above after again all am an and any are as at be been before being
+below between both but by can could did do does doing down during each few
+for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours out over own same she should so some such than
+that the their theirs them then there these they this those through to too
+under until up very was we were what when where which while who whom why
+will with would you your yours
+detail details get give help info information know like need please tell
+thank thanks want
+""".split())
+
+
+def stem(token: str) -> str:
+    """Very light suffix stripping so 'schedules'/'scheduled' meet 'schedule'"""
+    for suffix in ('ing', 'ed', 'es', 's'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4 and not token.endswith('ss'):
+            return token[:-len(suffix)]
+    return token
+
+
+def terms(text: str) -> List[str]:
+    """Index terms of a text: word tokens, minus stop words, stemmed"""
+    return [stem(token) for token in TOKEN_RE.findall(text.lower())
+            if token[0].isalnum() and token not in STOP_WORDS]
+
+
+def category_documents(knowledge_base: Dict) -> Dict[str, List[str]]:
+    """Terms per category; keywords are listed twice to outweigh the long answers"""
+    documents = {}
+    for category, data in knowledge_base.items():
+        keyword_text = ' '.join(data["keywords"])
+        documents[category] = terms(keyword_text) * 2 + terms(' '.join(data["responses"]))
+    return documents
+
+
+class TfidfIndex:
+    """Dense, L2-normalized category x term TF-IDF matrix"""
+
+    def __init__(self, documents: Dict[str, Sequence[str]]):
+        self.categories: List[str] = list(documents)
+        vocabulary: Dict[str, int] = {}
+        for doc in documents.values():
+            for term in doc:
+                vocabulary.setdefault(term, len(vocabulary))
+        self.vocabulary = vocabulary
+
+        counts = np.zeros((len(self.categories), len(vocabulary)), dtype=np.float32)
+        for row, doc in enumerate(documents.values()):
+            for term in doc:
+                counts[row, vocabulary[term]] += 1
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(self.categories)) / (1 + document_frequency)) + 1).astype(np.float32)
+        weights = np.log1p(counts) * self.idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self.matrix = np.ascontiguousarray(weights / norms)
+
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base: Dict) -> 'TfidfIndex':
+        return cls(category_documents(knowledge_base))
+
+    def search(self, tokens: Iterable[str], k: int = 3) -> List[Tuple[str, float]]:
+        """Top-k (category, cosine score) for a tokenized query, best first"""
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            if token in STOP_WORDS or not token[0].isalnum():
+                continue
+            column = self.vocabulary.get(stem(token))
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        if not counts:
+            return []
+
+        columns = np.fromiter(counts, dtype=np.intp, count=len(counts))
+        query = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts))) * self.idf[columns]
+        query /= np.linalg.norm(query)
+
+        # Only the query's columns can contribute, so multiply just those
+        scores = self.matrix[:, columns] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.categories[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+class Bm25Index:
+    """
+    Inverted index (term -> posting list of categories) with BM25 weights.
+
+    Each posting stores the term's precomputed BM25 contribution to that
+    category, so a search only walks the posting lists of the query's own
+    terms: its cost grows with the query, not with the knowledge base.
+    """
+
+    def __init__(self, documents: Dict[str, Sequence[str]], k1: float = 1.2, b: float = 0.75):
+        self.categories: List[str] = list(documents)
+        self.k1 = k1
+        self.b = b
+        lengths = [len(doc) for doc in documents.values()]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        total = len(self.categories)
+
+        frequencies: Dict[str, Dict[int, int]] = {}
+        for row, doc in enumerate(documents.values()):
+            for term in doc:
+                postings = frequencies.setdefault(term, {})
+                postings[row] = postings.get(row, 0) + 1
+
+        self.postings: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+        for term, postings in frequencies.items():
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            self.postings[term] = tuple(
+                (row, idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[row] / average_length)))
+                for row, tf in postings.items()
+            )
+
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base: Dict, **params) -> 'Bm25Index':
+        return cls(category_documents(knowledge_base), **params)
+
+    def search(self, tokens: Iterable[str], k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k (category, BM25 score) for a tokenized query, best first"""
+        scores: Dict[int, float] = {}
+        seen = set()
+        for token in tokens:
+            if token in STOP_WORDS or not token[0].isalnum():
+                continue
+            term = stem(token)
+            if term in seen:
+                continue
+            seen.add(term)
+            for row, weight in self.postings.get(term, ()):
+                scores[row] = scores.get(row, 0.0) + weight
+        best = heapq.nlargest(k, scores.items(), key=itemgetter(1))
+        return [(self.categories[row], score) for row, score in best]
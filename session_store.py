@@ -0,0 +1,194 @@
+"""
+Server-side chat session store
+
+Keeps a compact state per sessionId so clients only send the new message:
+- the dialogue tracker state (last_stage, stage_entity, last_category,
+  see dialogue_state.DialogueTracker)
+- turns: the last few user/assistant turns, in the conversationHistory
+  format
+
+Two backends:
+- InMemorySessionStore: per process, LRU + TTL eviction, capped size
+- SQLiteSessionStore: shared file, for gunicorn with several workers
+
+Pick one with SESSION_STORE=memory|sqlite (see create_session_store).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dialogue_state import new_dialogue_state
+from fork_safety import fork_safe_lock
+
+MAX_TURNS = 5
+MAX_MESSAGE_CHARS = 500
+
+
+def new_session_state() -> Dict:
+    return {**new_dialogue_state(), "turns": []}
+
+
+def record_turn(state: Dict, user_message: str, result: Dict, max_turns: int = MAX_TURNS) -> Dict:
+    """Append one user/assistant exchange to a session state, in place"""
+    turns = state["turns"]
+    turns.append({"role": "user", "message": user_message[:MAX_MESSAGE_CHARS]})
+    # The engine only reads the category of assistant turns, not the text
+    turns.append({"role": "assistant", "category": result.get("category")})
+    del turns[:-max_turns]
+    return state
+
+
+class SessionStore(ABC):
+    """Interface of a session backend"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Dict:
+        """Return the session state, or a fresh one if missing or expired"""
+
+    @abstractmethod
+    def save(self, session_id: str, state: Dict) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict:
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Per-process store with LRU eviction beyond max_sessions and a TTL"""
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 1800.0, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = fork_safe_lock(self)
+        self.evictions = 0
+
+    def get(self, session_id: str) -> Dict:
+        now = self._clock()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] < now:
+                return new_session_state()
+            self._sessions.move_to_end(session_id)
+            state = entry[1]
+            return {**state, "turns": list(state["turns"])}
+
+    def save(self, session_id: str, state: Dict) -> None:
+        expires = self._clock() + self.ttl
+        with self._lock:
+            self._sessions[session_id] = (expires, state)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl": self.ttl,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store shared by every worker on the host.
+
+    Connections are opened lazily, per thread and per process, so the store
+    is safe to create before gunicorn forks its workers.
+    """
+
+    PURGE_EVERY = 200
+
+    def __init__(self, path: str, max_sessions: int = 100000, ttl: float = 1800.0):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = fork_safe_lock(self)
+        self._saves = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'id TEXT PRIMARY KEY, state TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, session_id: str) -> Dict:
+        row = self._connection().execute(
+            'SELECT state FROM sessions WHERE id = ? AND expires >= ?', (session_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else new_session_state()
+
+    def save(self, session_id: str, state: Dict) -> None:
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO sessions (id, state, expires) VALUES (?, ?, ?)',
+            (session_id, json.dumps(state, ensure_ascii=False), time.time() + self.ttl)
+        )
+        with self._lock:
+            self._saves += 1
+            purge = self._saves % self.PURGE_EVERY == 0
+        if purge:
+            self._purge(conn)
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        """Drop expired sessions, then the oldest ones beyond max_sessions"""
+        conn.execute('DELETE FROM sessions WHERE expires < ?', (time.time(),))
+        conn.execute(
+            'DELETE FROM sessions WHERE id IN ('
+            'SELECT id FROM sessions ORDER BY expires DESC LIMIT -1 OFFSET ?)', (self.max_sessions,)
+        )
+
+    def delete(self, session_id: str) -> None:
+        self._connection().execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def stats(self) -> Dict:
+        count = self._connection().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": count,
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+        }
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """Build the store selected by SESSION_STORE (memory by default)"""
+    backend = backend or os.environ.get('SESSION_STORE', 'memory')
+    ttl = float(os.environ.get('SESSION_TTL', 1800))
+    if backend == 'sqlite':
+        path = os.environ.get('SESSION_DB_PATH', 'sessions.sqlite3')
+        return SQLiteSessionStore(path, max_sessions=int(os.environ.get('SESSION_MAX', 100000)), ttl=ttl)
+    if backend == 'memory':
+        return InMemorySessionStore(max_sessions=int(os.environ.get('SESSION_MAX', 10000)), ttl=ttl)
+    raise ValueError(f"Unknown SESSION_STORE backend: {backend!r}")
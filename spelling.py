@@ -0,0 +1,140 @@
+"""
+Typo correction for incoming messages (symmetric deletion, SymSpell-style)
+
+SpellingCorrector precomputes, for every dictionary word, the strings left
+after deleting up to max_distance characters. A misspelled token is looked
+up by generating its own deletions: "helth" and "health" meet at "helth",
+"intervew" and "interview" at "intervew". Candidates are ranked by the
+number of deletions on each side, so there is no edit-distance computation
+at request time, and each distinct token is resolved once and cached.
+"""
+
+import re
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+WORD_RE = re.compile(r'[a-z]+')
+# Regex escapes (\b, \s+, \d) are not letters of the pattern's words
+REGEX_ESCAPE_RE = re.compile(r'\\[a-zA-Z]')
+
+
+def regex_literals(patterns: Iterable[str]) -> Set[str]:
+    """Plain words spelled out in regular expressions like r'\\bhealth\\s+form\\b'"""
+    words = set()
+    for pattern in patterns:
+        words.update(WORD_RE.findall(REGEX_ESCAPE_RE.sub(' ', pattern.lower())))
+    return words
+
+
+def inflections(words: Iterable[str]) -> Set[str]:
+    """Regular -s/-d/-ed/-ing forms, so 'generated' is not 'corrected' to 'generate'"""
+    forms = set()
+    for word in words:
+        stem = word[:-1] if word.endswith(('e', 'y')) else word
+        forms.update((word + 's', word + 'es', word + 'd', word + 'ed', stem + 'ed', stem + 'ing'))
+        if word.endswith('y'):
+            # enquiry -> enquiries, enquired
+            forms.update((stem + 'ies', stem + 'ied', stem + 'es'))
+    return forms
+
+
+def deletions(word: str, max_distance: int) -> Dict[str, int]:
+    """Every string reachable by deleting up to max_distance characters -> deletions used"""
+    variants = {word: 0}
+    for distance in range(1, min(max_distance, len(word) - 1) + 1):
+        for kept in combinations(range(len(word)), len(word) - distance):
+            variants.setdefault(''.join(word[i] for i in kept), distance)
+    return variants
+
+
+class SpellingCorrector:
+    """
+    Maps unknown tokens to the closest dictionary word.
+
+    - words: correction targets, with a frequency used to break ties
+    - known: further valid words that are never corrected (stop words, the
+      answers' vocabulary, off-topic terms); inflected forms of all these
+      words are known too
+    - stop_words: never a correction ("call" is not a typo of "all")
+
+    Short words have many valid neighbours ("best" is one letter from
+    "test"), so the allowed edits grow with the token: nothing below
+    min_length, a single missing or extra letter below short_word, one
+    edit of any kind below long_word, max_distance edits from there on
+    (but not max_distance substitutions, which reach too many real words).
+    Below short_word a token is not corrected to a shorter word either:
+    dropping a letter from a short real word ("scan") too often gives
+    another one ("can").
+    """
+
+    def __init__(self, words: Dict[str, int], known: Iterable[str] = (), stop_words: Iterable[str] = (),
+                 max_distance: int = 2, min_length: int = 4, short_word: int = 6, long_word: int = 8,
+                 cache_size: int = 4096):
+        stop_words = frozenset(stop_words)
+        self.words = {word: count for word, count in words.items() if word not in stop_words}
+        known = frozenset(known) | frozenset(words) | stop_words
+        self.known = known | frozenset(inflections(known))
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.short_word = short_word
+        self.long_word = long_word
+        self.cache_size = cache_size
+
+        index: Dict[str, Dict[str, int]] = {}
+        for word in self.words:
+            for variant, distance in deletions(word, max_distance).items():
+                targets = index.setdefault(variant, {})
+                targets[word] = min(distance, targets.get(word, distance))
+        self._deletes: Dict[str, Tuple[Tuple[str, int], ...]] = {
+            variant: tuple(targets.items()) for variant, targets in index.items()
+        }
+        self.correct_token = lru_cache(maxsize=cache_size)(self._lookup)
+
+    def __getstate__(self):
+        # The memoized lookup is per process; it is rebuilt empty on unpickling
+        state = self.__dict__.copy()
+        del state['correct_token']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.correct_token = lru_cache(maxsize=self.cache_size)(self._lookup)
+
+    def _lookup(self, token: str) -> Optional[str]:
+        """Dictionary word for a misspelled token, or None to keep it"""
+        if token in self.known or len(token) < self.min_length or not token.isalpha():
+            return None
+        limit = self.max_distance if len(token) >= self.long_word else 1
+        # Deletions on both sides add up to at most one substitution, and
+        # below short_word to none
+        total = 1 if len(token) < self.short_word else limit + 1
+        best = None
+        for variant, typed in deletions(token, limit).items():
+            for word, dropped in self._deletes.get(variant, ()):
+                distance = max(typed, dropped)
+                if distance > limit or typed + dropped > total:
+                    continue
+                if typed > dropped and len(token) < self.short_word:
+                    continue
+                rank = (distance, typed + dropped, -self.words[word], word)
+                if best is None or rank < best:
+                    best = rank
+        return best[3] if best else None
+
+    def correct(self, text: str) -> str:
+        """Text with misspelled words replaced; the same string if nothing changed"""
+        corrected = WORD_RE.sub(lambda m: self.correct_token(m.group()) or m.group(), text)
+        return text if corrected == text else corrected
+
+    def stats(self) -> Dict:
+        info = self.correct_token.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "words": len(self.words),
+            "deletions": len(self._deletes),
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+            "cache_size": info.currsize,
+        }
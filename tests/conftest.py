@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root (flat layout)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('METRICS_ENABLED', '0')
+os.environ.setdefault('KNOWLEDGE_BASE_POLL', '0')
+
+
+@pytest.fixture
+def client():
+    # Imported here, once the path and environment above are set
+    from app import app
+    return app.test_client()
@@ -0,0 +1,55 @@
+import json
+
+
+def lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_invalid_first_item_keeps_the_batch(client):
+    results = lines(client.post('/api/chatbot/messages', json=[None, {"message": "hi"}]))
+    assert [result["index"] for result in results] == [0, 1]
+    assert "error" in results[0]
+    assert "bot_response" in results[1]
+
+
+def test_unparsable_ndjson_line_is_reported_in_place(client):
+    body = 'not json\n{"message": "how do I fill the health form"}\n'
+    results = lines(client.post('/api/chatbot/messages', data=body, content_type='application/x-ndjson'))
+    assert [result["index"] for result in results] == [0, 1]
+    assert "error" in results[0]
+    assert "bot_response" in results[1]
+
+
+def test_failing_item_does_not_end_the_stream(client, monkeypatch):
+    def classify(user_message, conversation_history, dialogue_state):
+        if user_message == "boom":
+            raise RuntimeError("classification failed")
+        return original(user_message, conversation_history, dialogue_state)
+
+    import app as app_module
+    original = app_module._classify
+    monkeypatch.setattr(app_module, '_classify', classify)
+    results = lines(client.post('/api/chatbot/messages', json=[{"message": "boom"}, {"message": "hi"}]))
+    assert "error" in results[0]
+    assert "bot_response" in results[1]
+
+
+def test_empty_batch(client):
+    response = client.post('/api/chatbot/messages', json=[])
+    assert response.status_code == 200
+    assert lines(response) == []
+
+
+def test_fan_out_keeps_order_and_the_requested_worker_count(client, monkeypatch):
+    import app as app_module
+    monkeypatch.setattr(app_module, 'BATCH_MAX_WORKERS', 4)
+    monkeypatch.setattr(app_module, '_batch_pool', None)
+    messages = [{"message": f"how do I fill the health form {number}"} for number in range(40)]
+    results = lines(client.post('/api/chatbot/messages?workers=2', json=messages))
+    pool = app_module._batch_pool
+    try:
+        assert [result["index"] for result in results] == list(range(40))
+        assert all("bot_response" in result for result in results)
+        assert len(pool._processes) <= 2
+    finally:
+        pool.shutdown()
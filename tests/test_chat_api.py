@@ -0,0 +1,19 @@
+import pytest
+
+
+def test_message_is_answered(client):
+    response = client.post('/api/chat', json={"message": "how do I fill the health form"})
+    assert response.status_code == 200
+    assert response.get_json()["response"]
+
+
+@pytest.mark.parametrize('body', [
+    ["how do I fill the health form"],
+    "how do I fill the health form",
+    {"message": 42},
+    {"message": ["how do I fill the health form"]},
+])
+def test_malformed_body_is_a_client_error(client, body):
+    response = client.post('/api/chat', json=body)
+    assert response.status_code == 400
+    assert response.get_json()["error"]
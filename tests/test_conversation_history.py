@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.mark.parametrize('history', [
+    "I filled the application form",
+    {"role": "user", "message": "I filled the application form"},
+    42,
+    [None, "text", 3, ["nested"]],
+    [{"role": "user", "message": "I filled the application form"}, "stray entry"],
+])
+def test_malformed_history_is_ignored(client, history):
+    response = client.post('/api/chatbot/message',
+                           json={"message": "what is next?", "conversationHistory": history})
+    assert response.status_code == 200
+    assert response.get_json()["bot_response"]
+
+
+def test_valid_entries_next_to_malformed_ones_still_count(client):
+    history = [42, {"role": "user", "message": "I have filled the application form"}, None]
+    response = client.post('/api/chatbot/message',
+                           json={"message": "what is next?", "conversationHistory": history})
+    assert response.get_json()["category"] == "next-from-history-application_form"
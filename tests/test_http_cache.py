@@ -0,0 +1,29 @@
+def test_matching_etag_is_not_modified(client):
+    first = client.get('/api/chatbot/topics')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    again = client.get('/api/chatbot/topics', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == etag
+
+
+def test_stale_etag_gets_the_body(client):
+    response = client.get('/api/chatbot/topics', headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.get_json()
+
+
+def test_encodings_have_their_own_etag(client):
+    identity = client.get('/api/chatbot/process-flow')
+    gzipped = client.get('/api/chatbot/process-flow', headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzipped.headers['ETag'] != identity.headers['ETag']
+    assert 'Accept-Encoding' in gzipped.headers['Vary']
+
+
+def test_cross_origin_clients_can_read_the_timestamp_and_etag(client):
+    response = client.get('/api/chatbot/topics', headers={'Origin': 'https://school.example'})
+    assert response.headers['X-Timestamp']
+    exposed = {name.strip().lower() for name in response.headers['Access-Control-Expose-Headers'].split(',')}
+    assert {'x-timestamp', 'etag'} <= exposed
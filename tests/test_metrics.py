@@ -0,0 +1,31 @@
+import gc
+import os
+import weakref
+
+from metrics import Metrics
+
+RESULT = {"category": "healthForm", "intent": "keyword_match"}
+
+
+def test_collected_metrics_are_not_kept_alive():
+    metrics = Metrics()
+    collected = weakref.ref(metrics)
+    del metrics
+    gc.collect()
+    assert collected() is None
+
+
+def test_forked_child_starts_from_zero():
+    metrics = Metrics()
+    metrics.observe(RESULT, 0.0001, cached=False)
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        answers = sum(metrics.snapshot()["answers"].values())
+        os.write(write, str(answers).encode())
+        os._exit(0)
+    os.close(write)
+    os.waitpid(pid, 0)
+    with os.fdopen(read) as f:
+        assert f.read() == "0"
+    assert sum(metrics.snapshot()["answers"].values()) == 1
@@ -0,0 +1,24 @@
+import pytest
+
+from app import chatbot
+from utterance import Utterance
+
+
+@pytest.mark.parametrize('message, category', [
+    ("smartphone deals", "technology"),
+    ("various android phones", "technology"),
+    ("cooking tips for dinner", "food"),
+    ("weather forecast", "weather"),
+    ("2 + 3", "math_calculation"),
+])
+def test_off_topic_messages(message, category):
+    assert chatbot.off_topic_category(Utterance.build(message)) == category
+
+
+@pytest.mark.parametrize('message', [
+    "best platform to fill the application form",
+    "which hotel is near the school for the interview",
+    "documents for the cricket quota",
+])
+def test_admission_words_keep_a_message_on_topic(message):
+    assert chatbot.off_topic_category(Utterance.build(message)) is None
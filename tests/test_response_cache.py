@@ -0,0 +1,17 @@
+from response_cache import ResponseCache
+
+
+def test_hits_and_misses_are_counted():
+    cache = ResponseCache()
+    assert cache.get("question") is None
+    cache.put("question", "answer")
+    assert cache.get("question") == "answer"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_warm_up_leaves_no_cache_statistics():
+    from app import chatbot, warm_up
+    warm_up()
+    stats = chatbot.response_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (0, 0, 0)
@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from session_store import SessionStore, SQLiteSessionStore, new_session_state
+
+
+def test_incomplete_store_fails_when_created():
+    class Incomplete(SessionStore):
+        def get(self, session_id):
+            return new_session_state()
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sqlite_saves_from_several_threads_are_all_counted(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.sqlite3'))
+
+    def save(thread):
+        for number in range(50):
+            store.save(f'{thread}-{number}', new_session_state())
+
+    threads = [threading.Thread(target=save, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store._saves == 200
+    assert store.stats()["sessions"] == 200
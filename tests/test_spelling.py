@@ -0,0 +1,24 @@
+import pytest
+
+from app import chatbot
+
+
+@pytest.mark.parametrize('word', ["enquired", "call", "scan"])
+def test_real_words_are_not_corrected(word):
+    assert chatbot.spelling.correct_token(word) is None
+
+
+@pytest.mark.parametrize('typo, intended', [
+    ("helth", "health"),
+    ("intervew", "interview"),
+    ("enquirey", "enquiry"),
+])
+def test_typos_are_corrected(typo, intended):
+    assert chatbot.spelling.correct_token(typo) == intended
+
+
+def test_message_with_a_real_word_is_not_rewritten():
+    # "enquired" used to become "required", which sent this message to
+    # mandatoryFields; which topic answers it is up to the later stages
+    message = "list of families who enquired about admission"
+    assert chatbot.spelling.correct(message) == message
@@ -0,0 +1,39 @@
+import json
+
+from app import answer_chunks
+
+
+def events(response):
+    """(event, data) pairs of a text/event-stream body"""
+    parsed = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        if block:
+            event, data = block.split('\n')
+            assert event.startswith('event: ') and data.startswith('data: ')
+            parsed.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return parsed
+
+
+def test_answer_is_streamed_as_meta_chunks_done(client):
+    response = client.post('/api/chatbot/message/stream', json={"message": "how do I fill the health form"})
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    stream = events(response)
+    names = [name for name, _ in stream]
+    assert names[0] == 'meta' and names[-1] == 'done'
+    assert set(names[1:-1]) == {'chunk'}
+    meta = stream[0][1]
+    assert meta["category"] and "bot_response" not in meta
+    assert ''.join(data["text"] for _, data in stream[1:-1]).strip()
+
+
+def test_chunks_rejoin_to_the_answer():
+    text = "Fill the **Health Form** on the right side.\nIt is mandatory, so do it before registration."
+    chunks = list(answer_chunks(text, size=10))
+    assert len(chunks) > 1
+    assert ''.join(chunks) == text
+
+
+def test_missing_message_is_a_client_error(client):
+    response = client.post('/api/chatbot/message/stream', json={})
+    assert response.status_code == 400
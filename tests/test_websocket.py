@@ -0,0 +1,41 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('flask_sock')  # the WebSocket channel is optional
+simple_websocket = pytest.importorskip('simple_websocket')
+from werkzeug.serving import make_server
+
+import app as app_module
+
+
+@pytest.fixture
+def server():
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'ws://127.0.0.1:{server.server_port}/api/chatbot/ws'
+    server.shutdown()
+    thread.join()
+
+
+def test_each_frame_gets_a_reply(server):
+    ws = simple_websocket.Client(server + '?sessionId=test-socket')
+    try:
+        ws.send(json.dumps({"message": "how do I fill the health form", "requestId": 7}))
+        reply = json.loads(ws.receive(timeout=10))
+        assert reply["request_id"] == 7
+        assert reply["bot_response"] and reply["session_id"] == 'test-socket'
+        ws.send('not json')
+        assert json.loads(ws.receive(timeout=10))["error"]
+    finally:
+        ws.close()
+
+
+def test_idle_socket_is_closed(server, monkeypatch):
+    monkeypatch.setattr(app_module, 'SOCKET_IDLE_TIMEOUT', 0.5)
+    ws = simple_websocket.Client(server)
+    with pytest.raises(simple_websocket.ConnectionClosed) as closed:
+        ws.receive(timeout=10)
+    assert closed.value.message == "idle"
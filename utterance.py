@@ -0,0 +1,41 @@
+"""
+Single-pass preprocessing of an incoming message
+
+find_best_response builds one Utterance per message and hands it to every
+pipeline stage, instead of each stage lowercasing and tokenizing the raw
+string again.
+"""
+
+import re
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+import nltk_resources
+
+# Treebank-style word tokens: words, clitics ("what's" -> what, 's) and
+# single punctuation marks. One precompiled regex instead of the full
+# punkt + treebank pipeline, which costs ~100 us per message.
+TOKEN_RE = re.compile(r"\w+|'\w+|[^\w\s]")
+
+
+def normalize_message(user_input: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return ' '.join(user_input.lower().split())
+
+
+class Utterance(NamedTuple):
+    """Immutable view of one message, computed once per request"""
+    raw: str
+    text: str                      # lowercased, whitespace collapsed
+    tokens: Tuple[str, ...]
+    token_set: FrozenSet[str]
+    lemmas: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def build(cls, raw: str, lemmatize: bool = False) -> 'Utterance':
+        text = normalize_message(raw)
+        tokens = tuple(TOKEN_RE.findall(text))
+        lemmas = None
+        if lemmatize:
+            lemmatizer = nltk_resources.lemmatizer()
+            lemmas = tuple(lemmatizer.lemmatize(token) for token in tokens)
+        return cls(raw, text, tokens, frozenset(tokens), lemmas)